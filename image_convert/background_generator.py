@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Prozedurale Hintergründe für Mannschaftsfotos
+Verläufe und Muster werden als komplette Arrays berechnet statt Pixel für Pixel
+NumPy wird erst beim Erzeugen importiert, die CLI braucht nur STYLES und die Parser
+"""
+
+from PIL import Image, ImageColor
+
+STYLES = ['linear', 'radial', 'stripes']
+
+# Vereinsfarben-Verlauf wie der bisherige Beispiel-Hintergrund (30-80 / 130-180)
+DEFAULT_COLORS = ['#1e1e82', '#5050b4']
+
+LUT_SIZE = 1024
+
+
+def parse_size(value):
+    """
+    '1200x1600' → (1200, 1600)
+    """
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def parse_colors(value):
+    """
+    '#1e3a8a,#ffffff,red' → [(30, 58, 138), (255, 255, 255), (255, 0, 0)]
+    Bereits geparste RGB-Tupel werden unverändert übernommen
+    """
+    if isinstance(value, str):
+        value = value.split(',')
+    colors = []
+    for color in value:
+        if isinstance(color, str):
+            if not color.strip():
+                continue
+            color = ImageColor.getrgb(color.strip())
+        colors.append(tuple(color[:3]))
+    return colors
+
+
+def _apply_stops(t, colors):
+    """
+    Bildet t (0..1, beliebige Form) über mehrere gleichmäßig verteilte Farbstopps auf RGB ab
+    """
+    import numpy as np
+
+    colors = np.asarray(colors, dtype=np.float32)
+    if len(colors) == 1:
+        colors = np.vstack([colors, colors])
+    stops = np.linspace(0.0, 1.0, len(colors))
+
+    # Farbtabelle mit 1024 Stufen einmal interpolieren, dann nur noch nachschlagen
+    levels = np.linspace(0.0, 1.0, LUT_SIZE)
+    lut = np.stack([np.interp(levels, stops, colors[:, channel]) for channel in range(3)],
+                   axis=-1).astype(np.uint8)
+    index = (np.clip(t, 0.0, 1.0) * (LUT_SIZE - 1)).astype(np.intp)
+    return Image.fromarray(lut[index], 'RGB')
+
+
+def linear_gradient(size, colors, angle=90):
+    """
+    Linearer Verlauf, angle=90 verläuft von oben nach unten, 0 von links nach rechts
+    """
+    import numpy as np
+
+    width, height = size
+    rad = np.deg2rad(angle)
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32) * np.cos(rad)
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32) * np.sin(rad)
+    # Broadcasting statt Schleife: (1, w) + (h, 1) → (h, w)
+    t = x[np.newaxis, :] + y[:, np.newaxis]
+    t -= t.min()
+    if t.max() > 0:
+        t /= t.max()
+    return _apply_stops(t, colors)
+
+
+def radial_gradient(size, colors, center=(0.5, 0.4)):
+    """
+    Radialer Verlauf vom Zentrum (relative Koordinaten) nach außen
+    """
+    import numpy as np
+
+    width, height = size
+    x = np.arange(width, dtype=np.float32) - center[0] * width
+    y = np.arange(height, dtype=np.float32) - center[1] * height
+    t = np.hypot(x[np.newaxis, :], y[:, np.newaxis])
+    t /= t.max()
+    return _apply_stops(t, colors)
+
+
+def stripes(size, colors, stripe_width=80, angle=45, base=None):
+    """
+    Diagonale Streifen im Wechsel der Farben, optional über einem Verlauf
+    """
+    import numpy as np
+
+    width, height = size
+    rad = np.deg2rad(angle)
+    x = np.arange(width, dtype=np.float32) * np.cos(rad)
+    y = np.arange(height, dtype=np.float32) * np.sin(rad)
+    index = ((x[np.newaxis, :] + y[:, np.newaxis]) // stripe_width).astype(np.int64) % len(colors)
+    rgb = np.asarray(colors, dtype=np.uint8)[index]
+    img = Image.fromarray(rgb, 'RGB')
+    if base is not None:
+        # Streifen dezent über den Verlauf legen
+        img = Image.blend(base, img, 0.25)
+    return img
+
+
+def generate_background(style='linear', size=(1200, 1600), colors=None, **options):
+    """
+    Erzeugt einen Hintergrund im gewünschten Stil
+    """
+    colors = parse_colors(colors or DEFAULT_COLORS)
+    if style == 'linear':
+        return linear_gradient(size, colors, options.get('angle', 90))
+    if style == 'radial':
+        return radial_gradient(size, colors)
+    if style == 'stripes':
+        base = linear_gradient(size, colors, 90)
+        return stripes(size, colors, options.get('stripe_width', 80),
+                       options.get('angle', 45), base=base)
+    raise ValueError(f"Unbekannter Hintergrund-Stil: {style} (erlaubt: {', '.join(STYLES)})")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Hintergrund pro Spieler dekodieren vs. gemeinsame Vorlage
+Erzeugt synthetische Freisteller und vergleicht Laufzeit und Pillow-Allokationen.
+Die gemeinsame Vorlage bekommt die Freisteller wie in der Pipeline auf den Alphakanal
+zugeschnitten (cutout_store), der bisherige Ablauf die vollen Bilder
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compositor import load_background_template, paste_player, player_xy  # noqa: E402
+from cutout_store import crop_to_alpha  # noqa: E402
+
+
+def make_cutouts(folder, count, size=(1200, 1800)):
+    """
+    Synthetische Freisteller: transparentes Bild mit einer deckenden Spieler-Silhouette
+    """
+    files = []
+    for i in range(count):
+        img = Image.new('RGBA', size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+        offset = (i * 17) % 200
+        draw.ellipse((300 + offset, 200, 900 + offset // 2, 1700),
+                     fill=(200, 40 + i % 200, 60, 255))
+        path = Path(folder) / f"{i:03d}_Spieler_{i}_cutout.png"
+        img.save(path, 'PNG')
+        files.append(path)
+    return files
+
+
+def make_background(folder, size=(1200, 1600)):
+    path = Path(folder) / 'background.jpg'
+    Image.linear_gradient('L').resize(size).convert('RGB').save(path, 'JPEG', quality=95)
+    return path
+
+
+def load_player(cutout_file, max_height):
+    player = Image.open(cutout_file).convert('RGBA')
+    if player.height > max_height:
+        ratio = max_height / player.height
+        player = player.resize((int(player.width * ratio), max_height), Image.Resampling.LANCZOS)
+    return player
+
+
+def checksum(image):
+    """Nur die Prüfsumme behalten, damit die Bilder wie im echten Lauf freigegeben werden"""
+    return hashlib.sha256(image.tobytes()).hexdigest()
+
+
+def run_per_image_decode(bg_file, players, cropped_players):
+    """Bisheriger Ablauf: Hintergrund für jeden Spieler neu öffnen und konvertieren"""
+    results = []
+    for player in players:
+        background = Image.open(bg_file).convert('RGB')
+        x, y = player_xy(background.size, player.size)
+        background.paste(player, (x, y), player)
+        results.append(checksum(background))
+    return results
+
+
+def run_shared_template(bg_file, players, cropped_players):
+    """Neuer Ablauf: Vorlage einmal dekodieren, pro Spieler kopieren, zugeschnittene Spieler direkt einfügen"""
+    template = load_background_template(bg_file)
+    results = []
+    for player, offset, frame_size in cropped_players:
+        background = template.copy()
+        x, y = player_xy(background.size, frame_size)
+        paste_player(background, player, (x + offset[0], y + offset[1]), cropped=True)
+        results.append(checksum(background))
+    return results
+
+
+def measure(func, *args):
+    Image.core.reset_stats()
+    start = time.perf_counter()
+    results = func(*args)
+    elapsed = time.perf_counter() - start
+    stats = Image.core.get_stats()
+    return elapsed, stats, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für das Compositing')
+    parser.add_argument('--count', type=int, default=120, help='Anzahl Freisteller (Standard: 120)')
+    parser.add_argument('--max-height', type=int, default=1300, help='Zielhöhe der Spieler')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Erzeuge {args.count} synthetische Freisteller...")
+        cutout_files = make_cutouts(tmp, args.count)
+        bg_file = make_background(tmp)
+
+        # Spieler vorab laden, damit nur das Compositing gemessen wird
+        players = [load_player(f, args.max_height) for f in cutout_files]
+        cropped_players = [crop_to_alpha(player) for player in players]
+
+        rows = []
+        outputs = {}
+        for label, func in [('pro Bild dekodieren', run_per_image_decode),
+                            ('gemeinsame Vorlage', run_shared_template)]:
+            elapsed, stats, results = measure(func, bg_file, players, cropped_players)
+            outputs[label] = results
+            rows.append((label, elapsed, stats))
+
+        identical = outputs['pro Bild dekodieren'] == outputs['gemeinsame Vorlage']
+
+    # new_count: erzeugte Pillow-Bilder, allocated/reused: neue bzw. wiederverwendete Speicherblöcke
+    print(f"\n{'Variante':<22} {'ms/Bild':>9} {'Bilder/Bild':>12} {'neue Blöcke':>12} {'wiederverw.':>12}")
+    for label, elapsed, stats in rows:
+        print(f"{label:<22} {elapsed * 1000 / args.count:>9.2f} "
+              f"{stats['new_count'] / args.count:>12.1f} "
+              f"{stats['allocated_blocks'] / args.count:>12.2f} "
+              f"{stats['reused_blocks'] / args.count:>12.2f}")
+    print(f"\nAusgaben identisch: {'JA' if identical else 'NEIN'}")
+
+
+if __name__ == "__main__":
+    main()
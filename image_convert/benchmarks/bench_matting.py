@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Kantenverfeinerung per Alpha-Matting (--matting)
+Vergleicht Matting nur im unsicheren Band mit Matting über das ganze Bild, beides auf
+Arbeitsauflösung, wahlweise auch auf voller Auflösung wie rembg (alpha_matting=True).
+Qualität als mittlerer Alpha-Fehler (0-255) zum bekannten Umriss der synthetischen Fotos,
+im Band und über das ganze Bild. Zum Schluss ein zweiter Lauf über den MaskCache.
+Die grobe Maske wird simuliert wie aus einem 320x320-Modell: genau, mit Saum (Hintergrund
+am Rand mit drin) und zu knapp; mit --model kommt sie aus einem echten rembg-Modell
+
+Beispiel:
+    python benchmarks/bench_matting.py --images 3 --megapixels 12
+    python benchmarks/bench_matting.py --megapixels 2 --full-resolution --band 8
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic import RESOLUTIONS, silhouette_mask, write_photos  # noqa: E402
+
+# Eingangsgröße der u2net-Modelle
+MODEL_SIZE = (320, 320)
+
+# Simulierte Fehler der groben Maske: Filter auf dem Umriss vor dem 320x320-Umweg
+COARSE_ERRORS = {
+    'genau': None,
+    'Saum': ImageFilter.MaxFilter(7),
+    'zu knapp': ImageFilter.MinFilter(5),
+}
+
+
+def coarse_mask(truth, error=None):
+    """
+    Grobe Maske wie aus einem 320x320-Modell: Details gehen beim Herunterskalieren verloren
+    """
+    if error is not None:
+        truth = truth.filter(error)
+    return truth.resize(MODEL_SIZE, Image.Resampling.BILINEAR).resize(truth.size, Image.Resampling.BILINEAR)
+
+
+def alpha_error(mask, truth, region=None):
+    """
+    Mittlerer absoluter Alpha-Fehler (0-255), optional nur in region (boolesches Array)
+    """
+    diff = np.abs(np.asarray(mask, dtype=np.float64) - np.asarray(truth, dtype=np.float64))
+    return float(diff[region].mean() if region is not None else diff.mean())
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    from cutout_engine import cutout_working_resolution, init_worker, open_reduced, segment_mask
+    from cutout_store import MaskCache
+    from instrumentation import StageTimer
+    from matting import UNKNOWN, MattingParams, refine_full_frame, refine_mask, trimap
+
+    parser = argparse.ArgumentParser(description='Benchmark für Alpha-Matting im Kantenband')
+    parser.add_argument('--images', type=int, default=3, help='Anzahl Testbilder (Standard: 3)')
+    parser.add_argument('--megapixels', type=int, choices=sorted(RESOLUTIONS), default=12,
+                        help='Auflösung der Testbilder (Standard: 12)')
+    parser.add_argument('--mask-height', type=int, default=1024, help='Arbeitsauflösung der Maske (Standard: 1024)')
+    parser.add_argument('--band', type=int, default=6, help='Breite des unsicheren Bands in Pixeln (Standard: 6)')
+    parser.add_argument('--model', help='Grobe Maske aus diesem rembg-Modell statt simuliert')
+    parser.add_argument('--full-resolution', action='store_true',
+                        help='Zusätzlich Matting über das ganze Bild in voller Auflösung (langsam, viel Speicher)')
+    parser.add_argument('--output', type=Path,
+                        default=BENCH_DIR / 'results' / f"matting_{datetime.now():%Y%m%d_%H%M%S}.json",
+                        help='JSON-Datei für die Ergebnisse')
+    args = parser.parse_args()
+
+    params = MattingParams(args.band, 240, 10)
+    if args.model:
+        init_worker(args.model)
+    errors = {'Modell': None} if args.model else COARSE_ERRORS
+    rows = {}
+    band_share, cache_ms = [], []
+
+    def record(error_name, label, ms, refined, truth, unknown):
+        rows.setdefault((error_name, label), []).append(
+            (ms, alpha_error(refined, truth, unknown), alpha_error(refined, truth)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"⏱ Erzeuge {args.images} Testbilder mit {args.megapixels} MP...")
+        files = write_photos(Path(tmp) / 'photos', args.megapixels, args.images)
+        full_truth = silhouette_mask(RESOLUTIONS[args.megapixels])
+
+        # numba übersetzt pymatting beim ersten Aufruf, das soll nicht in die erste Messung
+        small = full_truth.resize((96, 128))
+        refine_full_frame(Image.merge('RGB', (small, small, small)), small, params)
+
+        for image_file in files:
+            work = open_reduced(image_file, args.mask_height)
+            truth = full_truth.resize(work.size, Image.Resampling.LANCZOS)
+            for error_name, error in errors.items():
+                coarse = segment_mask(work) if args.model else coarse_mask(truth, error)
+                unknown = trimap(coarse, params) == UNKNOWN
+                band_share.append(unknown.mean())
+
+                record(error_name, 'grob', 0, coarse, truth, unknown)
+                for label, refine in (('Band', refine_mask), ('ganzes Bild', refine_full_frame)):
+                    refined, ms = timed(refine, work, coarse, params)
+                    record(error_name, label, ms, refined, truth, unknown)
+
+                if args.full_resolution:
+                    with Image.open(image_file) as img:
+                        full = img.convert('RGB')
+                    full_coarse = segment_mask(full) if args.model else coarse_mask(full_truth, error)
+                    refined, ms = timed(refine_full_frame, full, full_coarse, params)
+                    # Fehler auf Arbeitsauflösung, damit alle Zeilen vergleichbar sind
+                    refined = refined.resize(work.size, Image.Resampling.LANCZOS)
+                    record(error_name, 'ganzes Bild, volle Aufl.', ms, refined, truth, unknown)
+
+            # Pipeline mit MaskCache: der zweite Lauf liest die verfeinerte Maske
+            mask_cache = MaskCache(Path(tmp) / 'masks')
+            init_worker(args.model or 'u2net', matting=params)
+            runs = []
+            for _ in range(2):
+                timer = StageTimer()
+                cutout_working_resolution(image_file, 800, args.mask_height, timer, mask_cache,
+                                          segment=None if args.model else (lambda _image: coarse))
+                runs.append(sum(timer.stages.values()))
+            cache_ms.append(runs)
+            init_worker(args.model or 'u2net')
+            print(f"  ✓ {image_file.name}")
+
+    print(f"\nArbeitsauflösung {work.size[0]}x{work.size[1]}, Band {args.band} px: "
+          f"{statistics.fmean(band_share) * 100:.1f}% der Pixel unsicher")
+    print(f"\n{'Grobe Maske':<12} {'Variante':<26} {'ms/Bild':>9} {'Fehler Band':>12} {'Fehler gesamt':>14}")
+    report = {'images': args.images, 'megapixels': args.megapixels, 'mask_height': args.mask_height,
+              'band': args.band, 'model': args.model, 'band_share': statistics.fmean(band_share),
+              'python': platform.python_version(), 'results': []}
+    for (error_name, label), values in rows.items():
+        ms, band_error, total_error = (statistics.fmean(column) for column in zip(*values))
+        timing = f"{ms:>9.0f}" if ms else f"{'-':>9}"
+        print(f"{error_name:<12} {label:<26} {timing} {band_error:>12.2f} {total_error:>14.3f}")
+        report['results'].append({'coarse': error_name, 'variant': label, 'ms': ms,
+                                  'mae_band': band_error, 'mae_total': total_error})
+
+    first, second = (statistics.fmean(column) for column in zip(*cache_ms))
+    print(f"\nFreisteller mit --matting: erster Lauf {first:.0f} ms, mit MaskCache {second:.0f} ms")
+    report['pipeline_ms'] = {'first': first, 'cached': second}
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Ergebnisse: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
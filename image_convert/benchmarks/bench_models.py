@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Vergleich der Segmentierungsmodelle (bench-models)
+Jedes Modell läuft in einem eigenen Prozess über dieselben Fotos in Arbeitsauflösung.
+Gemessen werden Ladezeit, Bilder pro Sekunde, Speicher-Peak und die Übereinstimmung
+der Masken (IoU) mit einem Referenzmodell, bei synthetischen Fotos zusätzlich mit dem
+bekannten Umriss
+
+Beispiel:
+    python benchmarks/bench_models.py                       # alle heruntergeladenen Modelle
+    python benchmarks/bench_models.py --models u2net,u2netp,silueta --reference u2net
+    python benchmarks/bench_models.py --models u2net,models/u2net-int8.onnx --input input_players
+    python benchmarks/bench_models.py --intra-op-threads 2 --inter-op-threads 1
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic import RESOLUTIONS, silhouette_mask, write_photos  # noqa: E402
+
+SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+
+def _peak_rss_mb():
+    # ru_maxrss ist unter Linux in KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_model(files, mask_folder, model_name, threads=None, inter_op_threads=None, mask_height=1024):
+    """
+    Läuft in einem eigenen Prozess, damit Ladezeit und Speicher-Peak nur zu diesem Modell gehören
+    Die Masken landen als PNG in mask_folder und werden im Hauptprozess verglichen
+    """
+    from cutout_engine import get_session, open_reduced, segment_mask
+
+    start = time.perf_counter()
+    get_session(model_name, threads, inter_op_threads)
+    model_load_ms = (time.perf_counter() - start) * 1000
+
+    mask_folder = Path(mask_folder)
+    mask_folder.mkdir(parents=True, exist_ok=True)
+    timings = []
+    for image_file in files:
+        image = open_reduced(image_file, mask_height)
+        start = time.perf_counter()
+        mask = segment_mask(image)
+        timings.append(time.perf_counter() - start)
+        mask.save(mask_folder / f"{Path(image_file).stem}.png")
+
+    ms = [t * 1000 for t in timings]
+    return {
+        'model_load_ms': model_load_ms,
+        'median_ms': statistics.median(ms),
+        'mean_ms': statistics.fmean(ms),
+        'images_per_sec': len(ms) / (sum(ms) / 1000),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _child(queue, *args):
+    try:
+        queue.put(bench_model(*args))
+    except Exception as e:
+        queue.put({'error': repr(e)})
+
+
+def run_isolated(*args):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_child, args=(queue, *args))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def iou(mask_a, mask_b):
+    """
+    Intersection over Union zweier Masken (Schwelle 50 %), gleiche Größe vorausgesetzt
+    """
+    if mask_b.size != mask_a.size:
+        mask_b = mask_b.resize(mask_a.size, Image.Resampling.BILINEAR)
+    a = np.asarray(mask_a.convert('L')) >= 128
+    b = np.asarray(mask_b.convert('L')) >= 128
+    union = np.logical_or(a, b).sum()
+    if not union:
+        return 1.0
+    return float(np.logical_and(a, b).sum() / union)
+
+
+def agreement(mask_folder, reference_folder):
+    """
+    (mittlere IoU, kleinste IoU, Datei mit der kleinsten IoU) über alle Masken
+    """
+    scores = {}
+    for mask_file in sorted(Path(mask_folder).glob('*.png')):
+        reference_file = Path(reference_folder) / mask_file.name
+        if not reference_file.exists():
+            continue
+        with Image.open(mask_file) as mask, Image.open(reference_file) as reference:
+            scores[mask_file.stem] = iou(reference, mask)
+    if not scores:
+        return None
+    worst = min(scores, key=scores.get)
+    return {'mean_iou': statistics.fmean(scores.values()), 'min_iou': scores[worst], 'worst': worst}
+
+
+def write_truth(files, folder):
+    """
+    Bekannte Umrisse der synthetischen Fotos als Masken in Arbeitsauflösung
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    for image_file in files:
+        with Image.open(image_file) as img:
+            size = img.size
+        silhouette_mask(size).save(folder / f"{Path(image_file).stem}.png")
+
+
+def metadata(args, models):
+    import PIL
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'models': models,
+        'reference': args.reference,
+        'input': str(args.input) if args.input else f"synthetisch {args.megapixels} MP",
+        'images': args.images,
+        'mask_height': args.mask_height,
+        'intra_op_threads': args.threads,
+        'inter_op_threads': args.inter_op_threads,
+    }
+
+
+def main():
+    from cutout_engine import DEFAULT_MASK_HEIGHT, DEFAULT_MODEL, available_models, installed_models, model_id
+
+    parser = argparse.ArgumentParser(description='Vergleich der Segmentierungsmodelle')
+    parser.add_argument('--models',
+                        help='Modelle oder .onnx-Dateien, kommagetrennt '
+                             f'(Standard: alle heruntergeladenen, bekannt: {", ".join(available_models())})')
+    parser.add_argument('--reference', default=DEFAULT_MODEL,
+                        help=f'Referenzmodell für die IoU (Standard: {DEFAULT_MODEL})')
+    parser.add_argument('--input', type=Path, help='Ordner mit echten Spielerfotos (Standard: synthetisch)')
+    parser.add_argument('--images', type=int, default=10, help='Anzahl Bilder (Standard: 10)')
+    parser.add_argument('--megapixels', type=int, default=12, choices=sorted(RESOLUTIONS),
+                        help='Auflösung der synthetischen Fotos (Standard: 12)')
+    parser.add_argument('--mask-height', type=int, default=DEFAULT_MASK_HEIGHT,
+                        help=f'Arbeitsauflösung der Maske wie in der Pipeline (Standard: {DEFAULT_MASK_HEIGHT})')
+    parser.add_argument('--intra-op-threads', '--threads', dest='threads', type=int, default=None,
+                        help='onnxruntime intra_op_num_threads (Standard: Vorgabe von onnxruntime)')
+    parser.add_argument('--inter-op-threads', type=int, default=None,
+                        help='onnxruntime inter_op_num_threads (Standard: Vorgabe von onnxruntime)')
+    parser.add_argument('--output', type=Path,
+                        default=BENCH_DIR / 'results' / f"models_{datetime.now():%Y%m%d_%H%M%S}.json",
+                        help='Ziel für die JSON-Ergebnisse')
+    args = parser.parse_args()
+
+    models = args.models.split(',') if args.models else installed_models()
+    if args.reference not in models:
+        # Die Referenz läuft immer mit, auch wenn sie nicht verglichen werden soll
+        models.insert(0, args.reference)
+    report = {'meta': metadata(args, models), 'results': []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.input:
+            files = sorted(path for path in args.input.iterdir()
+                           if path.suffix.lower() in SUPPORTED_FORMATS)[:args.images]
+            truth_folder = None
+        else:
+            print(f"⏱ Erzeuge {args.images} Testbilder mit {args.megapixels} MP...")
+            files = write_photos(Path(tmp) / 'photos', args.megapixels, args.images)
+            # Umriss in Arbeitsauflösung, gleiche Größe wie die Masken der Modelle
+            from cutout_engine import open_reduced
+            reduced_folder = Path(tmp) / 'reduced'
+            reduced_folder.mkdir()
+            reduced = []
+            for image_file in files:
+                path = reduced_folder / Path(image_file).name
+                open_reduced(image_file, args.mask_height).save(path)
+                reduced.append(path)
+            truth_folder = Path(tmp) / 'truth'
+            write_truth(reduced, truth_folder)
+        if not files:
+            print("✗ Keine Bilder gefunden")
+            return
+
+        mask_folders = {}
+        for model_name in models:
+            print(f"🧠 {model_name}...")
+            mask_folder = Path(tmp) / 'masks' / model_id(model_name)
+            result = run_isolated(files, mask_folder, model_name, args.threads, args.inter_op_threads,
+                                  args.mask_height)
+            if 'error' in result:
+                print(f"  ✗ Fehler: {result['error']}")
+                continue
+            mask_folders[model_name] = mask_folder
+            result['model'] = model_name
+            report['results'].append(result)
+
+        reference_folder = mask_folders.get(args.reference)
+        for result in report['results']:
+            mask_folder = mask_folders[result['model']]
+            result['reference'] = agreement(mask_folder, reference_folder) if reference_folder else None
+            result['truth'] = agreement(mask_folder, truth_folder) if truth_folder else None
+
+    print(f"\n{'Modell':<24} {'Laden ms':>9} {'Bilder/s':>9} {'Median ms':>10} {'Peak MB':>8} "
+          f"{'IoU Ref':>8} {'min':>6} {'IoU Umriss':>11}")
+    for result in report['results']:
+        reference = result['reference'] or {}
+        truth = result['truth'] or {}
+        print(f"{Path(result['model']).name:<24} {result['model_load_ms']:>9.0f} {result['images_per_sec']:>9.2f} "
+              f"{result['median_ms']:>10.1f} {result['peak_rss_mb']:>8.0f} "
+              f"{reference.get('mean_iou', float('nan')):>8.3f} {reference.get('min_iou', float('nan')):>6.3f} "
+              f"{truth.get('mean_iou', float('nan')):>11.3f}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Ergebnisse: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Pillow-Compositing pro Spieler vs. NumPy-Stapel (--numpy-compose)
+Misst nur Skalieren, Einfügen und Text (ohne Laden und JPEG) und vergleicht
+die Ergebnisse pixelgenau
+
+Beispiel:
+    python benchmarks/bench_numpy_compose.py --count 48 --batch-sizes 1,4,8,16
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_compositing import make_background, make_cutouts  # noqa: E402
+
+
+def main():
+    from batch_compositor import compose_batch
+    from compositor import load_background_template
+    from core import compose_player, extract_player_info, player_text_layers
+    from cutout_store import crop_to_alpha
+
+    parser = argparse.ArgumentParser(description='Benchmark für NumPy-Stapel-Compositing')
+    parser.add_argument('--count', type=int, default=48, help='Anzahl Freisteller (Standard: 48)')
+    parser.add_argument('--batch-sizes', default='1,4,8,16', help='Stapelgrößen, kommagetrennt')
+    parser.add_argument('--max-height', type=int, default=1300, help='Zielhöhe der Spieler')
+    parser.add_argument('--position', choices=['center', 'bottom', 'top'], default='bottom')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Erzeuge {args.count} synthetische Freisteller...")
+        cutout_files = make_cutouts(tmp, args.count)
+        template = load_background_template(make_background(tmp))
+        players = []
+        for cutout_file in cutout_files:
+            with Image.open(cutout_file) as img:
+                players.append((cutout_file.name, *crop_to_alpha(img.convert('RGBA'))))
+
+    start = time.perf_counter()
+    reference = [np.asarray(compose_player(template, player, name, args.position, max_height=args.max_height,
+                                           offset=offset, frame_size=frame_size))
+                 for name, player, offset, frame_size in players]
+    pillow_ms = (time.perf_counter() - start) * 1000 / len(players)
+
+    rows = [('Pillow einzeln', pillow_ms, True)]
+    for batch_size in (int(size) for size in args.batch_sizes.split(',')):
+        start = time.perf_counter()
+        results = []
+        for first in range(0, len(players), batch_size):
+            items = []
+            for name, player, offset, frame_size in players[first:first + batch_size]:
+                player_name, player_number = extract_player_info(name)
+                layers = player_text_layers(template.height, player_name, player_number)
+                items.append((player, offset, frame_size, layers))
+            results.extend(np.asarray(image) for image in
+                           compose_batch(template, items, args.position, 150, args.max_height))
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(players)
+        identical = all(np.array_equal(a, b) for a, b in zip(reference, results))
+        rows.append((f"NumPy Stapel {batch_size}", elapsed_ms, identical))
+
+    print(f"\n{'Variante':<18} {'ms/Bild':>9} {'Faktor':>8} {'pixelgleich':>12}")
+    for label, ms, identical in rows:
+        print(f"{label:<18} {ms:>9.2f} {pillow_ms / ms:>7.2f}x {'JA' if identical else 'NEIN':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Kombinieren mit 1, 2, 4, ... Prozessen (--compose-workers)
+Misst Durchsatz und Skalierung des Shared-Memory-Compositings auf synthetischen
+Freistellern und prüft, dass alle Läufe byte-identische JPEGs schreiben
+
+Beispiel:
+    python benchmarks/bench_parallel_compose.py --count 120 --workers 1,2,4,8
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_compositing import make_background, make_cutouts  # noqa: E402
+
+
+def digest(folder):
+    files = sorted(Path(folder).glob('*_final.jpg'))
+    return hashlib.sha256(b''.join(f.read_bytes() for f in files)).hexdigest(), len(files)
+
+
+def main():
+    from core import combine_with_background
+
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+    parser = argparse.ArgumentParser(description='Benchmark für paralleles Kombinieren')
+    parser.add_argument('--count', type=int, default=120, help='Anzahl Freisteller (Standard: 120)')
+    parser.add_argument('--workers', default=','.join(map(str, default_workers)),
+                        help=f'Prozesszahlen, kommagetrennt (Standard: {",".join(map(str, default_workers))})')
+    parser.add_argument('--max-height', type=int, default=1300, help='Zielhöhe der Spieler')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cutout_folder, bg_folder = tmp / 'cutouts', tmp / 'backgrounds'
+        cutout_folder.mkdir()
+        bg_folder.mkdir()
+        print(f"Erzeuge {args.count} synthetische Freisteller...")
+        make_cutouts(cutout_folder, args.count)
+        make_background(bg_folder)
+
+        rows = []
+        for workers in (int(w) for w in args.workers.split(',')):
+            output_folder = tmp / f"final_{workers}"
+            output_folder.mkdir()
+            start = time.perf_counter()
+            combine_with_background(cutout_folder, bg_folder, output_folder, max_height=args.max_height,
+                                    workers=workers)
+            elapsed = time.perf_counter() - start
+            rows.append((workers, elapsed, *digest(output_folder)))
+
+    base = rows[0][1] * rows[0][0]
+    print(f"\n{'Prozesse':>8} {'Bilder/s':>9} {'Beschl.':>8} {'Effizienz':>10}   ({cpu_count} CPU-Kerne)")
+    for workers, elapsed, _, count in rows:
+        speedup = base / elapsed
+        print(f"{workers:>8} {count / elapsed:>9.1f} {speedup:>7.2f}x {speedup / workers:>9.0%}")
+    identical = len({(checksum, count) for _, _, checksum, count in rows}) == 1
+    print(f"\nAusgaben identisch: {'JA' if identical else 'NEIN'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Vergleicht zwei JSON-Ergebnisse von run_pipeline.py
+Exit-Code 1, wenn eine Stufe um mehr als --threshold Prozent langsamer geworden ist
+
+Beispiel:
+    python benchmarks/compare.py results/alt.json results/neu.json --threshold 15
+"""
+
+import argparse
+import json
+import sys
+
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return {result['megapixels']: result for result in report['results']}, report['meta']
+
+
+def change(old, new):
+    if old == 0:
+        return 0.0
+    return (new - old) / old * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark-Ergebnisse vergleichen')
+    parser.add_argument('baseline', help='Älteres Ergebnis (JSON)')
+    parser.add_argument('candidate', help='Neueres Ergebnis (JSON)')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Erlaubte Verschlechterung in Prozent (Standard: 10)')
+    args = parser.parse_args()
+
+    baseline, baseline_meta = load(args.baseline)
+    candidate, candidate_meta = load(args.candidate)
+    if baseline_meta.get('segmenter') != candidate_meta.get('segmenter'):
+        print(f"⚠️ Unterschiedliche Segmentierer: {baseline_meta.get('segmenter')} "
+              f"vs. {candidate_meta.get('segmenter')}")
+    if baseline_meta.get('working_resolution') != candidate_meta.get('working_resolution'):
+        print("⚠️ Unterschiedlicher Pfad (Arbeitsauflösung vs. volle Auflösung)")
+
+    regressions = []
+    for megapixels in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[megapixels], candidate[megapixels]
+        print(f"\n{megapixels} MP")
+        print(f"  {'Stufe':<10} {'alt ms':>10} {'neu ms':>10} {'Δ %':>8}")
+        # Nur Stufen, die beide Läufe kennen (ältere Ergebnisse haben weniger Stufen)
+        rows = [(stage, old['stages'][stage]['median_ms'], new['stages'][stage]['median_ms'])
+                for stage in new['stages'] if stage in old['stages']]
+        rows.append(('gesamt', old['total_median_ms'], new['total_median_ms']))
+        rows.append(('Peak MB', old['peak_rss_mb'], new['peak_rss_mb']))
+        for label, old_value, new_value in rows:
+            delta = change(old_value, new_value)
+            marker = ''
+            if delta > args.threshold:
+                marker = ' ⚠️'
+                regressions.append((megapixels, label, delta))
+            print(f"  {label:<10} {old_value:>10.1f} {new_value:>10.1f} {delta:>+8.1f}{marker}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} Verschlechterung(en) über {args.threshold:.0f} %")
+        sys.exit(1)
+    print("\n✅ Keine Verschlechterung über dem Schwellwert")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark der image_convert-Pipeline
+Misst jede Stufe auf synthetischen Spielerfotos in mehreren Auflösungen über dieselben
+Funktionen wie die CLI: cutout_image (Standard: Arbeitsauflösung wie --working-resolution)
+→ crop_to_alpha → compose_player (fit_cutout, Einfügen, Text) → JPEG.
+Die Ergebnisse landen als JSON, damit Läufe miteinander verglichen werden können
+
+Beispiel:
+    python benchmarks/run_pipeline.py --resolutions 2,12,24 --images 5
+    python benchmarks/run_pipeline.py --segmenter rembg --model u2netp
+    python benchmarks/run_pipeline.py --full-resolution     # wie die CLI ohne --working-resolution
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic import RESOLUTIONS, stub_mask, write_photos  # noqa: E402
+
+# Stufen aus den StageTimern der Pipeline, resize umfasst Verkleinern beim Freistellen und fit_cutout
+STAGES = ['decode', 'segment', 'resize', 'upscale', 'crop', 'paste', 'text', 'encode']
+
+
+def _peak_rss_mb():
+    # ru_maxrss ist unter Linux in KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_files(files, segmenter='stub', model_name='u2net', add_text=True, working_resolution=True):
+    """
+    Läuft in einem eigenen Prozess, damit der Speicher-Peak pro Auflösung gilt
+    """
+    from background_generator import generate_background
+    from core import PLAYER_MAX_HEIGHT, compose_player
+    from cutout_engine import cutout_image, get_session, init_worker
+    from cutout_store import crop_to_alpha
+    from instrumentation import StageTimer
+
+    template = generate_background('linear', (1200, 1600)).convert('RGB')
+    target_height = PLAYER_MAX_HEIGHT if working_resolution else None
+    timings = {stage: [] for stage in STAGES}
+    encoded_bytes = []
+
+    model_load_ms = 0.0
+    segment = stub_mask
+    if segmenter == 'rembg':
+        init_worker(model_name)
+        start = time.perf_counter()
+        get_session()
+        model_load_ms = (time.perf_counter() - start) * 1000
+        segment = None
+
+    for image_file in files:
+        # Ein Timer pro Bild wie im Streaming-Modus, gleiche Stufen werden addiert
+        timer = StageTimer()
+        player = cutout_image(image_file, target_height, timer=timer, segment=segment)
+        with timer.stage('crop'):
+            player, offset, frame_size = crop_to_alpha(player)
+        # Debug-Ausgaben der Pipeline sind ohne setup_logging stumm
+        final = compose_player(template, player, Path(image_file).name, 'center', add_text,
+                               max_height=PLAYER_MAX_HEIGHT, timer=timer, offset=offset, frame_size=frame_size)
+        with timer.stage('encode'):
+            buffer = io.BytesIO()
+            final.save(buffer, 'JPEG', quality=95)
+        encoded_bytes.append(buffer.tell())
+        for stage in STAGES:
+            timings[stage].append(timer.stages.get(stage, 0.0) / 1000)
+
+    stages = {}
+    for stage, values in timings.items():
+        ms = [v * 1000 for v in values]
+        stages[stage] = {
+            'mean_ms': statistics.fmean(ms),
+            'median_ms': statistics.median(ms),
+            'min_ms': min(ms),
+            'max_ms': max(ms),
+        }
+    return {
+        'stages': stages,
+        'total_median_ms': sum(s['median_ms'] for s in stages.values()),
+        'model_load_ms': model_load_ms,
+        'peak_rss_mb': _peak_rss_mb(),
+        'jpeg_bytes_mean': statistics.fmean(encoded_bytes),
+    }
+
+
+def _child(queue, files, segmenter, model_name, add_text, working_resolution):
+    try:
+        queue.put(bench_files(files, segmenter, model_name, add_text, working_resolution))
+    except Exception as e:
+        queue.put({'error': repr(e)})
+
+
+def run_isolated(files, segmenter, model_name, add_text, working_resolution=True):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_child, args=(queue, files, segmenter, model_name, add_text, working_resolution))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def metadata(args):
+    import numpy
+    import PIL
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'segmenter': args.segmenter,
+        'model': args.model if args.segmenter == 'rembg' else None,
+        'images_per_resolution': args.images,
+        'text': not args.no_text,
+        'working_resolution': not args.full_resolution,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der Bild-Pipeline')
+    parser.add_argument('--resolutions', default='2,12,24',
+                        help=f'Megapixel, kommagetrennt (verfügbar: {sorted(RESOLUTIONS)})')
+    parser.add_argument('--images', type=int, default=5, help='Bilder pro Auflösung (Standard: 5)')
+    parser.add_argument('--segmenter', choices=['stub', 'rembg'], default='stub',
+                        help='stub: ohne Modell (offline), rembg: echtes Modell')
+    parser.add_argument('--model', default='u2net', help='rembg-Modell für --segmenter rembg')
+    parser.add_argument('--no-text', action='store_true', help='Text-Stufe auslassen')
+    parser.add_argument('--full-resolution', action='store_true',
+                        help='Maske auf voller Auflösung wie die CLI ohne --working-resolution')
+    parser.add_argument('--output', type=Path,
+                        default=BENCH_DIR / 'results' / f"pipeline_{datetime.now():%Y%m%d_%H%M%S}.json",
+                        help='Ziel für die JSON-Ergebnisse')
+    args = parser.parse_args()
+
+    resolutions = [int(r) for r in args.resolutions.split(',')]
+    report = {'meta': metadata(args), 'results': []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for megapixels in resolutions:
+            print(f"⏱ {megapixels} MP: erzeuge {args.images} Testbilder...")
+            files = write_photos(Path(tmp) / f"{megapixels}mp", megapixels, args.images)
+            result = run_isolated(files, args.segmenter, args.model, not args.no_text, not args.full_resolution)
+            if 'error' in result:
+                print(f"  ✗ Fehler: {result['error']}")
+                continue
+            result.update({'megapixels': megapixels, 'size': list(RESOLUTIONS[megapixels])})
+            report['results'].append(result)
+
+            stages = ', '.join(f"{stage} {result['stages'][stage]['median_ms']:.1f}" for stage in STAGES)
+            print(f"  ✓ {stages} ms | gesamt {result['total_median_ms']:.1f} ms "
+                  f"| Peak {result['peak_rss_mb']:.0f} MB")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Ergebnisse: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
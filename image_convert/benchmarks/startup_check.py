@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Prüft, dass die CLI schnell startet und ohne Modell auskommt, wenn keines gebraucht wird
+Führt core.py mit --setup und --combine-only in einem leeren Arbeitsordner aus und schlägt fehl,
+wenn dabei rembg/onnxruntime/NumPy geladen werden oder der Start zu lange dauert
+
+Beispiel:
+    python benchmarks/startup_check.py --max-ms 800
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+CORE_DIR = Path(__file__).resolve().parent.parent
+
+# Module, die nur für Freisteller oder Hintergrund-Erzeugung gebraucht werden
+HEAVY_MODULES = ['rembg', 'onnxruntime', 'numpy', 'scipy', 'skimage', 'pymatting', 'cv2']
+
+# Läuft im Kindprozess: CLI ausführen und danach die geladenen schweren Module melden
+PROBE = """
+import contextlib, io, json, sys
+sys.path.insert(0, {core_dir!r})
+import core
+with contextlib.redirect_stdout(io.StringIO()):
+    core.main({argv!r})
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+COMMANDS = [['--setup'], ['--combine-only']]
+
+
+def run_probe(argv, cwd):
+    """
+    Gibt (Dauer in ms, geladene schwere Module) für einen CLI-Aufruf zurück
+    """
+    code = PROBE.format(core_dir=str(CORE_DIR), argv=argv, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], cwd=cwd,
+                            capture_output=True, text=True, check=True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startzeit der CLI prüfen')
+    parser.add_argument('--max-ms', type=float, default=1000.0,
+                        help='Erlaubte Startzeit pro Aufruf in ms, Median (Standard: 1000)')
+    parser.add_argument('--runs', type=int, default=5, help='Wiederholungen pro Aufruf (Standard: 5)')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Vorhandener Hintergrund, damit --combine-only keinen Verlauf (NumPy) erzeugt
+        (Path(tmp) / 'backgrounds').mkdir()
+        Image.new('RGB', (120, 160), (30, 30, 130)).save(Path(tmp) / 'backgrounds' / 'bg.jpg')
+
+        for argv in COMMANDS:
+            timings, loaded = [], []
+            for _ in range(args.runs):
+                elapsed_ms, loaded = run_probe(argv, tmp)
+                timings.append(elapsed_ms)
+            median_ms = statistics.median(timings)
+            label = ' '.join(argv)
+            print(f"  {label:<16} {median_ms:>7.0f} ms  schwere Module: {', '.join(loaded) or '-'}")
+            if loaded:
+                failures.append(f"{label}: lädt {', '.join(loaded)}")
+            if median_ms > args.max_ms:
+                failures.append(f"{label}: {median_ms:.0f} ms > {args.max_ms:.0f} ms")
+
+    if failures:
+        print("\n❌ Startzeit-Prüfung fehlgeschlagen:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ CLI startet ohne Modell und innerhalb des Zeitlimits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Synthetische Spielerfotos für die Benchmarks
+Ein Spieler-Umriss vor grünem Studio-Hintergrund mit etwas Rauschen,
+damit die JPEG-Kodierung realistisch viel zu tun hat
+"""
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+# Hochformat-Auflösungen typischer Kameras (Megapixel → Größe)
+RESOLUTIONS = {
+    2: (1224, 1632),
+    12: (3000, 4000),
+    24: (4000, 6000),
+}
+
+BACKDROP = (40, 160, 70)
+
+
+def silhouette_mask(size):
+    """
+    Grober Spieler-Umriss (Kopf, Körper, Beine) als L-Maske
+    """
+    width, height = size
+    mask = Image.new('L', size, 0)
+    draw = ImageDraw.Draw(mask)
+    cx = width // 2
+    head = height // 10
+    draw.ellipse((cx - head // 2, height // 12, cx + head // 2, height // 12 + head), fill=255)
+    draw.rounded_rectangle((cx - width // 5, height // 12 + head, cx + width // 5, int(height * 0.62)),
+                           radius=width // 20, fill=255)
+    draw.rectangle((cx - width // 6, int(height * 0.62), cx - width // 50, height), fill=255)
+    draw.rectangle((cx + width // 50, int(height * 0.62), cx + width // 6, height), fill=255)
+    return mask.filter(ImageFilter.GaussianBlur(max(1, width // 400)))
+
+
+def make_player_photo(size, seed=0):
+    """
+    Spieler in Trikotfarben vor grünem Hintergrund, mit Rauschen
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    noise = rng.integers(-12, 13, size=(height, width, 3), dtype=np.int16)
+
+    backdrop = np.empty((height, width, 3), dtype=np.int16)
+    backdrop[:] = BACKDROP
+    jersey = np.empty_like(backdrop)
+    jersey[:] = (200, 30 + seed * 37 % 180, 40)
+
+    alpha = np.asarray(silhouette_mask(size), dtype=np.int16)[..., np.newaxis]
+    pixels = (jersey * alpha + backdrop * (255 - alpha)) // 255 + noise
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+
+
+def write_photos(folder, megapixels, count):
+    """
+    Schreibt count Fotos der gewünschten Auflösung als JPEG im Dateinamen-Format der Pipeline
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    size = RESOLUTIONS[megapixels]
+    files = []
+    for i in range(count):
+        path = folder / f"{10 + i}_Test_Spieler{i}_{megapixels}mp.jpg"
+        make_player_photo(size, seed=i).save(path, 'JPEG', quality=92)
+        files.append(path)
+    return files
+
+
+def stub_mask(image):
+    """
+    Ersatz-Segmentierer ohne Modell: alles, was nicht nach grünem Hintergrund aussieht
+    """
+    pixels = np.asarray(image.convert('RGB'), dtype=np.int16)
+    distance = np.abs(pixels - np.array(BACKDROP, dtype=np.int16)).sum(axis=-1)
+    return Image.fromarray(np.where(distance > 90, 255, 0).astype(np.uint8), 'L')
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Katalog der Spielerfotos aus den Dateiköpfen
+Liest nur Header (Format, Größe, EXIF-Orientierung) und den Datei-Hash, keine Pixel.
+Name und Nummer werden einmal geparst, Namensprobleme fallen vor dem Lauf auf.
+Das Ergebnis ist zugleich der Kader-Index für Hugo (data/team-roster.json)
+"""
+
+import heapq
+import json
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from pipeline_cache import file_hash
+
+# Außerhalb von final_results: enthält lokale Pfade und wird nicht hochgeladen
+ROSTER_FILE = 'team-roster.json'
+
+# EXIF-Orientierungen, bei denen Breite und Höhe vertauscht sind
+_SWAPPED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Grobe Kosten auf einem 4-Kern-Laptop (CPU), nur für die Planung mit --dry-run
+SEGMENT_MS = 800
+DECODE_MS_PER_MP = 10
+ENCODE_MS_PER_MP = 40
+
+
+def read_header(path):
+    """
+    (Format, Breite, Höhe, Orientierung) ohne Dekodieren, Breite/Höhe nach EXIF-Drehung
+    """
+    with Image.open(path) as img:
+        width, height = img.size
+        orientation = img.getexif().get(0x0112, 1)
+        image_format = img.format
+    if orientation in _SWAPPED_ORIENTATIONS:
+        width, height = height, width
+    return image_format, width, height, orientation
+
+
+def load_roster(path=ROSTER_FILE):
+    """
+    Vorheriger Katalog als {Datei: Eintrag}, leer wenn nicht vorhanden oder defekt
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {entry['file']: entry for entry in json.load(f).get('players', [])}
+    except (OSError, ValueError, KeyError, AttributeError):
+        return {}
+
+
+def catalog_entry(path, parse_name, previous=None):
+    """
+    Eintrag für ein Foto, Header und Hash werden aus previous übernommen,
+    wenn Größe und Änderungszeit der Datei gleich geblieben sind
+    """
+    path = Path(path)
+    stat = path.stat()
+    name, number = parse_name(path.name)
+    entry = {'file': str(path), 'stem': path.stem, 'name': name, 'number': number,
+             'bytes': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    if previous and previous.get('bytes') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns \
+            and previous.get('sha256'):
+        for key in ('format', 'width', 'height', 'orientation', 'sha256', 'error'):
+            if key in previous:
+                entry[key] = previous[key]
+        return entry
+
+    try:
+        entry['format'], entry['width'], entry['height'], entry['orientation'] = read_header(path)
+    except (OSError, ValueError) as e:
+        entry.update({'format': None, 'width': 0, 'height': 0, 'orientation': 1,
+                      'error': f"{type(e).__name__}: {e}"})
+    entry['sha256'] = file_hash(path)
+    return entry
+
+
+def find_problems(entries, min_height=None, check_names=True):
+    """
+    Trägt pro Eintrag eine Liste 'problems' ein (fehlende/doppelte Nummern, unlesbar, zu klein)
+    min_height: nur mit Zielhöhe (Arbeitsauflösung) prüfen, sonst wird ohnehin verkleinert
+    check_names: Name und Nummer nur prüfen, wenn sie als Text gesetzt werden
+    """
+    by_number = {}
+    for entry in entries:
+        if entry['number'].isdigit():
+            by_number.setdefault(entry['number'], []).append(entry)
+
+    for entry in entries:
+        problems = []
+        if entry.get('error'):
+            problems.append(f"Datei nicht lesbar ({entry['error']})")
+        if check_names:
+            if entry['number'] == '?':
+                problems.append('keine Rückennummer im Dateinamen')
+            elif not entry['number'].isdigit():
+                problems.append(f"Nummer '{entry['number']}' ist keine Zahl")
+            elif len(by_number[entry['number']]) > 1:
+                others = [other['stem'] for other in by_number[entry['number']] if other is not entry]
+                problems.append(f"Nummer {entry['number']} doppelt ({', '.join(others)})")
+            if not entry['name'].strip():
+                problems.append('kein Name im Dateinamen')
+        if min_height and 0 < entry['height'] < min_height:
+            problems.append(f"nur {entry['height']} px hoch (Ziel {min_height} px)")
+        entry['problems'] = problems
+    return entries
+
+
+def build_catalog(image_files, parse_name, previous=None, min_height=None, check_names=True):
+    """
+    Katalog aller image_files, parse_name: Dateiname → (Name, Nummer)
+    previous: {Datei: Eintrag} aus load_roster, unveränderte Dateien werden nicht neu gelesen
+    min_height, check_names: siehe find_problems
+    """
+    previous = previous or {}
+    entries = [catalog_entry(path, parse_name, previous.get(str(path))) for path in image_files]
+    return find_problems(entries, min_height, check_names)
+
+
+def _number_key(entry):
+    number = entry['number']
+    return (0, int(number), entry['name']) if number.isdigit() else (1, 0, entry['name'])
+
+
+def write_roster(entries, path=ROSTER_FILE):
+    """
+    Schreibt den Katalog nach Nummer sortiert als {"players": [...]} (atomar)
+    Ohne Zeitstempel, damit Hugo nur bei echten Änderungen neu baut
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(path.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'players': sorted(entries, key=_number_key)}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, path)
+    return path
+
+
+def schedule(entries):
+    """
+    Größte Bilder zuerst: lange Aufgaben starten früh, am Ende füllen die kleinen die Lücken
+    """
+    return sorted(entries, key=lambda entry: entry['width'] * entry['height'], reverse=True)
+
+
+def estimate_ms(entry, target_height=None, segment=True):
+    """
+    Geschätzte Dauer eines Freistellers in ms aus den Header-Daten
+    target_height: Arbeitsauflösung (JPEG wird mit draft() verkleinert dekodiert)
+    segment: False, wenn die Maske schon im MaskCache liegt
+    """
+    megapixels = entry['width'] * entry['height'] / 1e6
+    decode_mp = megapixels
+    output_mp = megapixels
+    if target_height and entry['height'] > target_height:
+        output_mp = megapixels * (target_height / entry['height']) ** 2
+        if entry['format'] == 'JPEG':
+            # draft() dekodiert mit 1/2, 1/4 oder 1/8, mindestens in Zielgröße
+            scale = 1
+            while scale < 8 and entry['height'] / (scale * 2) >= target_height:
+                scale *= 2
+            decode_mp = megapixels / scale ** 2
+    return decode_mp * DECODE_MS_PER_MP + output_mp * ENCODE_MS_PER_MP + (SEGMENT_MS if segment else 0)
+
+
+def makespan_ms(costs, workers):
+    """
+    Gesamtdauer, wenn die Aufgaben in dieser Reihenfolge immer an den freiesten Worker gehen
+    """
+    loads = [0.0] * max(1, workers)
+    for cost in costs:
+        heapq.heappush(loads, heapq.heappop(loads) + cost)
+    return max(loads)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compositing-Engine für Mannschaftsfotos
+Der Hintergrund wird nur einmal dekodiert und als Vorlage gehalten,
+jeder Spieler bekommt eine günstige Kopie davon
+"""
+
+import math
+
+from PIL import Image
+
+
+def load_background_template(bg_file):
+    """
+    Dekodiert und konvertiert den Hintergrund genau einmal
+    Die Vorlage wird nicht verändert, Spieler werden immer auf template.copy() gesetzt
+    """
+    with Image.open(bg_file) as img:
+        template = img.convert('RGB')
+    template.load()
+    return template
+
+
+def player_xy(bg_size, player_size, player_position='center', text_space=0, margin=50):
+    """
+    Berechnet die linke obere Ecke des Spielers auf dem Hintergrund
+    text_space: Platz links für Text, der Spieler wird um die Hälfte nach rechts verschoben
+    """
+    bg_width, bg_height = bg_size
+    player_width, player_height = player_size
+
+    x = (bg_width - player_width) // 2 + text_space // 2
+    if player_position == 'center':
+        y = (bg_height - player_height) // 2
+    elif player_position == 'bottom':
+        y = bg_height - player_height - margin
+    else:  # top
+        y = margin
+    return x, y
+
+
+def fit_cutout(player, offset, frame_size, max_height):
+    """
+    Skaliert einen zugeschnittenen Freisteller so, wie das volle Bild auf max_height skaliert würde
+    Gibt (Spieler, Versatz, Bildgröße) in der Zielgröße zurück
+    Das Ergebnis entspricht pixelgenau dem entsprechenden Ausschnitt des skalierten Vollbilds
+    """
+    frame_width, frame_height = frame_size
+    if frame_height <= max_height:
+        return player, offset, frame_size
+
+    scaled_size = (int(frame_width * max_height / frame_height), max_height)
+    scale_x = scaled_size[0] / frame_width
+    scale_y = scaled_size[1] / frame_height
+
+    # Zielbereich des Ausschnitts im skalierten Vollbild
+    left = math.floor(offset[0] * scale_x)
+    top = math.floor(offset[1] * scale_y)
+    right = min(scaled_size[0], math.ceil((offset[0] + player.width) * scale_x))
+    bottom = min(scaled_size[1], math.ceil((offset[1] + player.height) * scale_y))
+
+    # Transparenter Rand für den Lanczos-Filter, aber nie über das Vollbild hinaus,
+    # damit der Filter an denselben Kanten abgeschnitten wird wie beim Vollbild
+    margin_x = math.ceil(4 / scale_x) + 1
+    margin_y = math.ceil(4 / scale_y) + 1
+    pad_left = min(margin_x, offset[0])
+    pad_top = min(margin_y, offset[1])
+    pad_right = min(margin_x, frame_width - offset[0] - player.width)
+    pad_bottom = min(margin_y, frame_height - offset[1] - player.height)
+    padded = Image.new('RGBA', (player.width + pad_left + pad_right,
+                                player.height + pad_top + pad_bottom), (0, 0, 0, 0))
+    padded.paste(player, (pad_left, pad_top))
+
+    origin_x, origin_y = offset[0] - pad_left, offset[1] - pad_top
+    box = (left / scale_x - origin_x, top / scale_y - origin_y,
+           right / scale_x - origin_x, bottom / scale_y - origin_y)
+    player = padded.resize((right - left, bottom - top), Image.Resampling.LANCZOS, box=box)
+    return player, (left, top), scaled_size
+
+
+def paste_player(background, player, position, cropped=False):
+    """
+    Setzt den Spieler per Alpha-Blending auf den Hintergrund
+    Geblendet wird nur innerhalb der Bounding-Box des sichtbaren Spielers
+    cropped: player ist schon auf den Alphakanal zugeschnitten (cutout_store, fit_cutout),
+    dann ohne Bounding-Box und ohne Zwischenbild direkt einfügen
+    """
+    if cropped:
+        # Transparente Randpixel lassen den Hintergrund beim Blenden unverändert
+        background.paste(player, position, player)
+        return background
+
+    # getbbox() wertet bei RGBA nur den Alphakanal aus (ohne Zwischenbild)
+    bbox = player.getbbox()
+    if bbox is None:
+        # Komplett transparent, nichts zu tun
+        return background
+
+    if bbox != (0, 0, player.width, player.height):
+        player = player.crop(bbox)
+
+    x, y = position
+    background.paste(player, (x + bbox[0], y + bbox[1]), player)
+    return background
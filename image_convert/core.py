@@ -0,0 +1,1241 @@
+#!/usr/bin/env python3
+"""
+Automatische Freisteller für Mannschaftsfotos
+Gemeinsamer Kern und CLI für mannschaftsfotos.py (ohne Text) und images_text.py (mit Text)
+
+Schwere Abhängigkeiten (rembg/onnxruntime, NumPy) werden erst importiert, wenn sie
+wirklich gebraucht werden: --setup und --combine-only starten ohne das Modell.
+benchmarks/startup_check.py prüft das.
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+from cutout_engine import DEFAULT_MASK_HEIGHT, DEFAULT_MODEL, get_session, model_id, resolve_workers, run_cutouts
+from cutout_store import MASK_CACHE_DIR, MaskCache, crop_to_alpha, load_cutout
+from background_generator import DEFAULT_COLORS, STYLES, generate_background, parse_colors, parse_size
+from compositor import fit_cutout, load_background_template, paste_player, player_xy
+from variants import DEFAULT_FORMATS, DEFAULT_WIDTHS, VariantWriter, parse_formats, parse_widths, write_variants_for_folder
+from encoder import EncodeTarget, describe, parse_bytes
+from matting import matting_key, parse_matting
+from pipeline_cache import PipelineCache, file_hash, settings_key
+from text_renderer import name_paste_y, render_name_layer, render_number_layer, resolve_font_path
+from instrumentation import MetricsWriter, StageTimer, profiled, setup_logging
+from targets import parse_target, resolve_targets, targets_for_backgrounds
+from team_sheet import TEAM_SIZE, render_team, write_contact_sheet
+from watcher import DEFAULT_SETTLE, FolderWatcher
+from parallel_compose import run_compose
+from uploader import DEFAULT_BUCKET, DEFAULT_PREFIX, DEFAULT_WORKERS as UPLOAD_WORKERS, public_url, upload_folders
+from catalog import ROSTER_FILE, build_catalog, estimate_ms, load_roster, makespan_ms, schedule, write_roster
+
+# Zielhöhe der Spieler auf dem finalen Bild (mit Text; ohne Text setzt mannschaftsfotos.py 1300)
+PLAYER_MAX_HEIGHT = 800
+
+# Unterstützte Bildformate der Spielerfotos
+SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
+
+# Unterstützte Formate der Hintergrundbilder
+BACKGROUND_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+logger = logging.getLogger(__name__)
+
+def setup_directories():
+    """Erstellt die benötigten Ordnerstrukturen"""
+    directories = ['input_players', 'output_cutouts', 'backgrounds', 'final_results']
+    for dir_name in directories:
+        Path(dir_name).mkdir(exist_ok=True)
+        logger.info("✓ Ordner '%s' bereit", dir_name)
+
+def find_input_images(input_folder):
+    """
+    Alle Spielerfotos im input_folder (unterstützte Formate)
+    """
+    return [f for f in Path(input_folder).iterdir()
+            if f.suffix.lower() in SUPPORTED_FORMATS]
+
+def remove_background_batch(input_folder, output_folder, workers=1, threads=None, model_name=DEFAULT_MODEL, cache=None, target_height=None, mask_height=DEFAULT_MASK_HEIGHT, metrics=None, mask_cache=None, image_files=None, catalog=None, inter_op_threads=None, matting=None):
+    """
+    Entfernt Hintergrund von allen Bildern im input_folder
+    workers: Anzahl paralleler Prozesse (0 = alle CPU-Kerne)
+    threads: ONNX-Threads pro Worker (intra-op, Standard: Kerne / Worker)
+    inter_op_threads: onnxruntime inter_op_num_threads (Standard: Vorgabe von onnxruntime)
+    cache: PipelineCache, unveränderte Bilder werden übersprungen
+    target_height: Maske auf Arbeitsauflösung berechnen und Freisteller direkt in dieser Höhe speichern
+    metrics: MetricsWriter, ein Datensatz pro Bild
+    mask_cache: MaskCache, für Bilder mit gespeicherter Maske läuft das Modell nicht erneut
+    image_files: nur diese Bilder verarbeiten (--watch), sonst alle im input_folder
+    catalog: Einträge aus catalog.py, liefert Hashes und die Reihenfolge (größte Bilder zuerst)
+    matting: MattingParams, Kanten der Maske per Alpha-Matting verfeinern (nur mit target_height)
+    """
+    output_path = Path(output_folder)
+
+    # Alle Bilddateien finden
+    full_scan = image_files is None
+    image_files = find_input_images(input_folder) if full_scan else list(image_files)
+    entries = {}
+    if catalog:
+        entries = {Path(entry['file']): entry for entry in catalog}
+        # Lange Aufgaben zuerst in den Pool, kleine füllen am Ende die Lücken
+        order = {Path(entry['file']): i for i, entry in enumerate(schedule(catalog))}
+        image_files.sort(key=lambda f: order.get(f, len(order)))
+
+    workers, threads = resolve_workers(workers, threads)
+    logger.info("Gefunden: %s Bilder zum Verarbeiten", len(image_files))
+
+    # Unveränderte Bilder überspringen, Freisteller gelöschter Bilder entfernen
+    keys = {}
+    if cache is not None:
+        for removed in cache.prune('cutout'):
+            logger.info("  🗑 Entfernt (Quelle gelöscht): %s", removed.name)
+        hashes = {image_file: entries[image_file]['sha256'] if image_file in entries else file_hash(image_file)
+                  for image_file in image_files}
+        for image_file in image_files:
+            keys[image_file] = cutout_key(hashes[image_file], model_id(model_name), target_height, mask_height,
+                                          matting)
+        if mask_cache is not None and full_scan:
+            # Nur mit allen Hashes wissen wir, welche Masken verwaist sind
+            for removed in mask_cache.prune(hashes.values()):
+                logger.debug("  🗑 Maske entfernt (Quelle gelöscht): %s", removed.name)
+        skipped = [f for f in image_files if cache.is_fresh('cutout', f, keys[f])]
+        if skipped:
+            logger.info("Unverändert, übersprungen: %s", len(skipped))
+        if metrics is not None:
+            for image_file in skipped:
+                metrics.record('cutout', image_file, 'skipped')
+        image_files = [f for f in image_files if f not in skipped]
+
+    logger.info("Modell: %s, Worker: %s, Threads pro Worker: %s (inter-op: %s)", model_name, workers, threads,
+                inter_op_threads or 'Standard')
+    if matting is not None:
+        logger.info("Matting: Band %s px, Schwellen %s/%s", *matting)
+
+    results = run_cutouts(image_files, output_path, workers, threads, model_name,
+                          target_height, mask_height, mask_cache, inter_op_threads, matting)
+    for i, (image_file, output_file, error, stages) in enumerate(results, 1):
+        if error is None:
+            logger.info("  ✓ (%s/%s) %s → %s", i, len(image_files), image_file.name, output_file.name)
+            if cache is not None:
+                cache.record('cutout', image_file, keys[image_file], [output_file])
+        else:
+            logger.error("  ✗ (%s/%s) Fehler bei %s: %s", i, len(image_files), image_file.name, error)
+        if metrics is not None:
+            metrics.record('cutout', image_file, 'ok' if error is None else 'error',
+                           stages, output_file, error)
+
+    logger.info("\n🎉 Freisteller abgeschlossen! %s Bilder verarbeitet.", len(image_files))
+
+def cutout_key(source_hash, model_name=DEFAULT_MODEL, target_height=None, mask_height=DEFAULT_MASK_HEIGHT,
+               matting=None):
+    """
+    Cache-Schlüssel eines Freistellers (gleich für den Lauf und für --dry-run)
+    matting nur, wenn gesetzt: bestehende Einträge ohne Matting bleiben gültig
+    """
+    settings = {'matting': list(matting)} if matting is not None else {}
+    return settings_key(source_hash, model=model_name, crop=True,
+                        target_height=target_height, mask_height=mask_height, **settings)
+
+def catalog_inputs(input_folder, roster_file=ROSTER_FILE, min_height=None, write=True, check_names=True):
+    """
+    Katalog aller Spielerfotos aus den Dateiköpfen, meldet Namensprobleme vor dem Lauf
+    min_height: Zielhöhe mit --working-resolution, kleinere Fotos werden gemeldet
+    write: Kader-Index nach roster_file schreiben (nicht bei --dry-run)
+    check_names: Name und Nummer prüfen (nur nötig, wenn Text gesetzt wird)
+    """
+    catalog = build_catalog(find_input_images(input_folder), extract_player_info,
+                            load_roster(roster_file), min_height, check_names)
+    for entry in catalog:
+        for problem in entry['problems']:
+            logger.warning("  ⚠️ %s: %s", Path(entry['file']).name, problem)
+    if write and catalog:
+        write_roster(catalog, roster_file)
+        logger.info("📇 Kader-Index: %s (%s Spieler)", roster_file, len(catalog))
+    return catalog
+
+def print_plan(catalog, cache, mask_cache, workers, model_name=DEFAULT_MODEL, target_height=None,
+               mask_height=DEFAULT_MASK_HEIGHT, matting=None):
+    """
+    --dry-run: Reihenfolge, Cache-Status und geschätzte Dauer der Freisteller, ohne Pixel zu dekodieren
+    """
+    # Ohne Arbeitsauflösung liegt die Maske unter 'full' im Cache
+    cache_height = mask_height if target_height else None
+    # Mit Matting zählt die verfeinerte Maske, die grobe allein spart nur das Modell
+    mask_name = matting_key(model_id(model_name), matting) if matting is not None else model_id(model_name)
+    logger.info("\n📋 Plan: %s Bilder, %s Worker, größte zuerst", len(catalog), workers)
+    logger.info("  %3s  %-32s %11s %6s %4s  %-18s %9s", '#', 'Datei', 'Größe', 'MP', 'EXIF', 'Status', 'geschätzt')
+    costs, fresh, cached_masks = [], 0, 0
+    for i, entry in enumerate(schedule(catalog), 1):
+        source = Path(entry['file'])
+        if entry.get('error'):
+            status, cost = 'nicht lesbar', 0
+        elif cache.is_fresh('cutout', source, cutout_key(entry['sha256'], model_id(model_name), target_height, mask_height,
+                                                          matting)):
+            status, cost = 'unverändert', 0
+            fresh += 1
+        else:
+            has_mask = mask_cache.enabled and mask_cache.path(entry['sha256'], mask_name, cache_height).exists()
+            status = 'neu (Maske im Cache)' if has_mask else 'neu'
+            cached_masks += has_mask
+            cost = estimate_ms(entry, target_height, segment=not has_mask)
+            costs.append(cost)
+        logger.info("  %3s  %-32s %11s %6.1f %4s  %-18s %8.1fs", i, source.name[:32],
+                    f"{entry['width']}x{entry['height']}", entry['width'] * entry['height'] / 1e6,
+                    entry['orientation'], status, cost / 1000)
+    logger.info("\nFreisteller: %s neu (%s mit gespeicherter Maske), %s unverändert",
+                len(costs), cached_masks, fresh)
+    logger.info("Geschätzte Dauer: %.1f s Rechenzeit, ca. %.1f s mit %s Worker(n)",
+                sum(costs) / 1000, makespan_ms(costs, workers) / 1000, workers)
+    problems = sum(1 for entry in catalog if entry['problems'])
+    if problems:
+        logger.warning("⚠️ %s Dateien mit Problemen (siehe oben)", problems)
+
+def extract_player_info(filename):
+    """
+    Extrahiert Spielername und Nummer aus dem Dateinamen
+    Erwartet Format: "36_Moritz_Breves.jpg" oder "Mueller_Max_7.jpg"
+    """
+    stem = Path(filename).stem.replace('_cutout', '').replace('_final', '')
+
+    logger.debug("  🔍 Debug: Dateiname '%s' → Stamm: '%s'", filename, stem)
+
+    # Verschiedene Namensformate unterstützen
+    parts = stem.split('_')
+    logger.debug("  🔍 Debug: Aufgeteilte Teile: %s", parts)
+
+    if len(parts) >= 3:
+        # Format: Nummer_Vorname_Nachname oder Nachname_Vorname_Nummer
+        if parts[0].isdigit():
+            # Format: 36_Moritz_Breves
+            number = parts[0]
+            firstname = parts[1] if len(parts) > 1 else ""
+            lastname = parts[2] if len(parts) > 2 else ""
+            full_name = f"{firstname} {lastname}".strip()
+        else:
+            # Format: Nachname_Vorname_Nummer
+            lastname = parts[0]
+            firstname = parts[1]
+            number = parts[-1]  # Letzte Teil als Nummer
+            full_name = f"{firstname} {lastname}"
+    elif len(parts) == 2:
+        # Format: Name_Nummer oder Vorname_Nachname
+        if parts[1].isdigit():
+            full_name = parts[0]
+            number = parts[1]
+        elif parts[0].isdigit():
+            number = parts[0]
+            full_name = parts[1]
+        else:
+            full_name = f"{parts[0]} {parts[1]}"
+            number = "?"
+    else:
+        # Nur ein Name
+        full_name = stem
+        number = "?"
+
+    logger.debug("  🔍 Debug: Ergebnis → Name: '%s', Nummer: '%s'", full_name, number)
+    return full_name, number
+
+def player_text_layers(img_height, player_name, player_number, font_path=None, number_size=120, name_size=60):
+    """
+    Vorgerenderte Text-Ebenen (RGBA) mit Position: [(Nummer, (x, y)), (Name rotiert, (x, y))]
+    Gemeinsam für add_player_text und den NumPy-Stapel (batch_compositor.py)
+    """
+    # Schriftart einmal pro Lauf auflösen (gecacht)
+    resolved_font = resolve_font_path(font_path)
+
+    # Position für Text auf der linken Seite
+    left_margin = 50
+
+    # 1. Nummer oben links
+    number_y = 260
+
+    # Weißer Text mit schwarzem Rand, als gecachte Ebene (Nummern wiederholen sich)
+    number_layer, (offset_x, offset_y) = render_number_layer(player_number, resolved_font, number_size)
+
+    # 2. Name rotiert (90 Grad) unter der Nummer
+    name_start_y = number_y + 200
+
+    # Ebene wird aus der echten Textgröße berechnet, lange Namen passen vollständig
+    rotated_text = render_name_layer(player_name, resolved_font, name_size)
+    paste_x = left_margin - 50
+    paste_y = name_paste_y(name_start_y, rotated_text.height, img_height)
+
+    return [(number_layer, (left_margin + offset_x, number_y + offset_y)),
+            (rotated_text, (paste_x, paste_y))]
+
+def add_player_text(image, player_name, player_number, font_path=None, number_size=120, name_size=60):
+    """
+    Fügt Spielername (rotiert) und Nummer auf der linken Seite hinzu
+    number_size: Schriftgröße für die Nummer (Standard: 120)
+    name_size: Schriftgröße für den Namen (Standard: 60)
+    """
+    logger.debug("    🎨 Füge Text hinzu: Name='%s', Nummer='%s'", player_name, player_number)
+    logger.debug("    📏 Schriftgrößen: Nummer=%s, Name=%s", number_size, name_size)
+
+    # Nur den nicht-transparenten Teil der Ebenen einfügen
+    for layer, position in player_text_layers(image.height, player_name, player_number, font_path,
+                                              number_size, name_size):
+        image.paste(layer, position, layer)
+    logger.debug("    ✓ Nummer '%s' und Name '%s' hinzugefügt", player_number, player_name)
+
+    return image
+
+def resize_player(player_img, max_height=PLAYER_MAX_HEIGHT):
+    """
+    Größe des Spielerbildes anpassen (proportional)
+    """
+    if player_img.height > max_height:
+        ratio = max_height / player_img.height
+        new_width = int(player_img.width * ratio)
+        player_img = player_img.resize((new_width, max_height), Image.Resampling.LANCZOS)
+    return player_img
+
+def find_backgrounds(bg_folder):
+    """
+    Alle Hintergrundbilder im bg_folder, alphabetisch sortiert
+    """
+    return sorted(f for f in Path(bg_folder).iterdir()
+                  if f.suffix.lower() in BACKGROUND_FORMATS)
+
+def find_background(bg_folder):
+    """
+    Sucht die Hintergrundbilder und gibt das erste zurück (None, wenn keines da ist)
+    """
+    bg_path = Path(bg_folder)
+
+    # Hintergrundbilder finden
+    bg_files = find_backgrounds(bg_path)
+
+    logger.info("Gefundene Hintergrundbilder: %s", [f.name for f in bg_files])
+
+    if not bg_files:
+        logger.error("❌ Keine Hintergrundbilder gefunden!")
+        logger.error("Gesucht in: %s", bg_path.absolute())
+        logger.error("Unterstützte Formate: jpg, jpeg, png, bmp")
+        return None
+
+    # Erstes Hintergrundbild als Standard verwenden
+    bg_file = bg_files[0]
+    logger.info("Verwende Hintergrund: %s", bg_file.name)
+    return bg_file
+
+def compose_player(template, player, source_name, player_position='center', add_text=True, font_path=None, number_size=120, name_size=60, max_height=PLAYER_MAX_HEIGHT, timer=None, offset=None, frame_size=None, player_info=None, in_place=False):
+    """
+    Setzt einen freigestellten Spieler auf eine Kopie der Hintergrund-Vorlage und fügt Text hinzu
+    source_name: Dateiname, aus dem Name und Nummer gelesen werden
+    player_info: (Name, Nummer) direkt vorgeben statt aus dem Dateinamen lesen
+    timer: StageTimer für die Stufen resize, paste und text
+    offset, frame_size: Versatz und Originalgröße eines zugeschnittenen Freistellers
+    (ohne offset wird player als volles Bild betrachtet und hier zugeschnitten)
+    in_place: direkt auf template zeichnen (eigener Puffer eines Compositing-Workers)
+    """
+    timer = timer or StageTimer()
+
+    # Spielergröße anpassen, skaliert wird nur der sichtbare Ausschnitt
+    with timer.stage('resize'):
+        if offset is None:
+            player, offset, frame_size = crop_to_alpha(player)
+        player, offset, frame_size = fit_cutout(player, offset, frame_size, max_height)
+
+    with timer.stage('paste'):
+        # Günstige Kopie der bereits dekodierten Vorlage
+        background = template if in_place else template.copy()
+
+        # Position des vollen Bildes berechnen (etwas nach rechts verschieben für Text)
+        # Platz für Text auf der linken Seite lassen
+        text_space = 150 if add_text else 0
+        x, y = player_xy(background.size, frame_size, player_position, text_space)
+
+        # Spieler mit seinem Versatz auf Hintergrund setzen
+        paste_player(background, player, (x + offset[0], y + offset[1]), cropped=True)
+    logger.debug("  ✓ Spieler eingefügt bei Position (%s, %s)", x, y)
+
+    # Text hinzufügen
+    if add_text:
+        player_name, player_number = player_info or extract_player_info(source_name)
+        logger.debug("  📝 Füge Text hinzu: '%s' #%s", player_name, player_number)
+
+        if player_name and player_number and player_name.strip() and player_number.strip():
+            with timer.stage('text'):
+                background = add_player_text(background, player_name, player_number, font_path, number_size, name_size)
+            logger.debug("  ✅ Text erfolgreich hinzugefügt")
+        else:
+            logger.warning("  ⚠️ Konnte Name/Nummer nicht extrahieren (%s)", source_name)
+
+    return background
+
+def combine_with_background(cutout_folder, bg_folder, output_folder, player_position='center', add_text=True, font_path=None, number_size=120, name_size=60, cache=None, variants=None, max_height=PLAYER_MAX_HEIGHT, metrics=None, cutout_files=None, workers=1, batch_size=None):
+    """
+    Kombiniert freigestellte Spieler mit Hintergründen und fügt Text hinzu
+    cache: PipelineCache, unveränderte Spieler werden übersprungen
+    variants: VariantWriter, schreibt responsive Varianten aus dem fertigen Bild
+    metrics: MetricsWriter, ein Datensatz pro Bild
+    cutout_files: nur diese Freisteller kombinieren (--watch), sonst alle im cutout_folder
+    workers: Prozesse fürs Kombinieren, ab 2 liegt die Vorlage im Shared Memory (parallel_compose.py)
+    batch_size: Spieler im Stapel mit NumPy kombinieren (batch_compositor.py), None = einzeln mit Pillow
+    """
+    cutout_path = Path(cutout_folder)
+    output_path = Path(output_folder)
+
+    # Einstellungen, die das finale Bild beeinflussen (Teil des Cache-Schlüssels)
+    settings = {'position': player_position, 'max_height': max_height, 'text': add_text,
+                'font': font_path, 'number_size': number_size, 'name_size': name_size}
+    if variants is not None:
+        settings['variants'] = [variants.widths, variants.formats, describe(variants.target)]
+
+    # Erstes Hintergrundbild als Standard verwenden
+    bg_file = find_background(bg_folder)
+    if bg_file is None:
+        return
+    bg_hash = file_hash(bg_file) if cache is not None else None
+
+    # Hintergrund nur einmal dekodieren
+    template = load_background_template(bg_file)
+
+    # Freigestellte Spieler finden
+    all_cutouts = list(cutout_path.glob('*_cutout.png'))
+    cutout_files = all_cutouts if cutout_files is None else list(cutout_files)
+
+    # Finale Bilder entfernen, deren Freisteller nicht mehr existiert
+    if cache is not None:
+        for removed in cache.prune('combine'):
+            logger.info("  🗑 Entfernt (Freisteller gelöscht): %s", removed.name)
+
+    logger.info("Kombiniere %s Spieler mit Hintergrund...", len(cutout_files))
+    logger.info("Text hinzufügen: %s", 'JA' if add_text else 'NEIN')
+
+    parallel = workers > 1 and len(cutout_files) > 1
+    deferred = parallel or bool(batch_size)
+    jobs, keys = [], {}
+    written = skipped = 0
+    for i, cutout_file in enumerate(cutout_files, 1):
+        timer = StageTimer()
+        output_file = None
+        key = None
+        try:
+            logger.debug("Kombiniere (%s/%s): %s", i, len(cutout_files), cutout_file.name)
+
+            # Ausgabename generieren
+            player_name_clean = cutout_file.stem.replace('_cutout', '')
+            output_file = output_path / f"{player_name_clean}_final.jpg"
+
+            if cache is not None:
+                key = settings_key(file_hash(cutout_file), background=bg_hash, **settings)
+                if cache.is_fresh('combine', cutout_file, key):
+                    logger.info("  ⏭ Unverändert, übersprungen: %s", output_file.name)
+                    skipped += 1
+                    if metrics is not None:
+                        metrics.record('combine', cutout_file, 'skipped', output_file=output_file)
+                    continue
+
+            if deferred:
+                # Erledigen die Compositing-Prozesse bzw. der NumPy-Stapel unten
+                jobs.append((cutout_file, output_file))
+                keys[cutout_file] = key
+                continue
+
+            # Spieler laden (mit Transparenz) und auf eine Kopie der Vorlage setzen
+            with timer.stage('decode'):
+                player, offset, frame_size = load_cutout(cutout_file)
+            background = compose_player(template, player, cutout_file.name, player_position,
+                                        add_text, font_path, number_size, name_size, max_height, timer,
+                                        offset, frame_size)
+
+            # Speichern
+            with timer.stage('encode'):
+                background.save(output_file, 'JPEG', quality=95)
+            logger.info("  ✓ Gespeichert: %s", output_file.name)
+            written += 1
+
+            # Responsive Varianten aus dem bereits dekodierten Bild (im Hintergrund)
+            outputs = [output_file]
+            if variants is not None:
+                # Wartezeit, wenn alle Varianten-Slots belegt sind
+                with timer.stage('variants'):
+                    variants.submit(background, player_name_clean)
+                outputs.extend(variants.paths(player_name_clean, background.width))
+            if cache is not None:
+                cache.record('combine', cutout_file, key, outputs)
+            if metrics is not None:
+                metrics.record('combine', cutout_file, 'ok', timer.stages, output_file)
+
+        except Exception as e:
+            logger.error("  ✗ Fehler bei %s: %s", cutout_file.name, e)
+            if metrics is not None:
+                metrics.record('combine', cutout_file, 'error', timer.stages, error=e)
+            continue
+
+    if jobs:
+        options = {'player_position': player_position, 'add_text': add_text, 'font_path': font_path,
+                   'number_size': number_size, 'name_size': name_size, 'max_height': max_height}
+        if parallel:
+            logger.info("🧩 Kombiniere %s Spieler mit %s Prozessen...", len(jobs), min(workers, len(jobs)))
+            results = run_compose(jobs, template, workers, options)
+        else:
+            logger.info("🧩 Kombiniere %s Spieler in NumPy-Stapeln zu %s...", len(jobs), batch_size)
+            results = compose_numpy_batches(jobs, template, batch_size, **options)
+        for cutout_file, output_file, error, stages in results:
+            if error is not None:
+                logger.error("  ✗ Fehler bei %s: %s", cutout_file.name, error)
+                if metrics is not None:
+                    metrics.record('combine', cutout_file, 'error', stages, error=error)
+                continue
+            logger.info("  ✓ Gespeichert: %s", output_file.name)
+            written += 1
+
+            outputs = [output_file]
+            if variants is not None:
+                # Das fertige Bild lag nur im Worker vor, Varianten aus der gespeicherten Datei
+                player_name_clean = cutout_file.stem.replace('_cutout', '')
+                with Image.open(output_file) as img:
+                    variants.submit(img.convert('RGB'), player_name_clean)
+                    outputs.extend(variants.paths(player_name_clean, img.width))
+            if cache is not None:
+                cache.record('combine', cutout_file, keys[cutout_file], outputs)
+            if metrics is not None:
+                metrics.record('combine', cutout_file, 'ok', stages, output_file)
+
+    if variants is not None:
+        finish_variants(variants, [f.stem.replace('_cutout', '') for f in all_cutouts])
+
+    logger.info("\n🎉 Kombinierung abgeschlossen! %s finale Bilder erstellt.", written)
+    if skipped:
+        logger.info("Unverändert, übersprungen: %s", skipped)
+
+def compose_numpy_batches(jobs, template, batch_size, player_position='center', add_text=True, font_path=None, number_size=120, name_size=60, max_height=PLAYER_MAX_HEIGHT):
+    """
+    Wie compose_player, aber batch_size Spieler gemeinsam mit NumPy (batch_compositor.py)
+    jobs: [(Freisteller, Ausgabedatei), ...]
+    Liefert (Freisteller, Ausgabedatei, Fehler, Stufen) wie run_compose
+    """
+    # NumPy erst laden, wenn der Stapel-Modus gewählt ist
+    from batch_compositor import compose_batch
+
+    text_space = 150 if add_text else 0
+    for start in range(0, len(jobs), batch_size):
+        items, loaded = [], []
+        for cutout_file, output_file in jobs[start:start + batch_size]:
+            timer = StageTimer()
+            try:
+                with timer.stage('decode'):
+                    player, offset, frame_size = load_cutout(cutout_file)
+                layers = []
+                if add_text:
+                    with timer.stage('text'):
+                        player_name, player_number = extract_player_info(cutout_file.name)
+                        if player_name and player_number and player_name.strip() and player_number.strip():
+                            layers = player_text_layers(template.height, player_name, player_number,
+                                                        font_path, number_size, name_size)
+                        else:
+                            logger.warning("  ⚠️ Konnte Name/Nummer nicht extrahieren (%s)", cutout_file.name)
+            except Exception as e:
+                yield cutout_file, output_file, e, timer.stages
+                continue
+            items.append((player, offset, frame_size, layers))
+            loaded.append((cutout_file, output_file, timer))
+        if not items:
+            continue
+
+        batch_start = time.perf_counter()
+        try:
+            images = compose_batch(template, items, player_position, text_space, max_height)
+        except Exception as e:
+            for cutout_file, output_file, timer in loaded:
+                yield cutout_file, output_file, e, timer.stages
+            continue
+        # Stapelzeit gleichmäßig auf die Spieler verteilen
+        share_ms = (time.perf_counter() - batch_start) * 1000 / len(items)
+        del items
+
+        for (cutout_file, output_file, timer), image in zip(loaded, images):
+            timer.stages['batch'] = share_ms
+            try:
+                with timer.stage('encode'):
+                    image.save(output_file, 'JPEG', quality=95)
+            except Exception as e:
+                yield cutout_file, output_file, e, timer.stages
+                continue
+            yield cutout_file, output_file, None, timer.stages
+
+def combine_targets(cutout_folder, targets, output_folder, font_path=None, number_size=120, name_size=60, cache=None, max_height=PLAYER_MAX_HEIGHT, metrics=None, workers=None, cutout_files=None):
+    """
+    Rendert jeden Spieler auf mehrere Ziele (Hintergrund, Position, Text) in einem Durchlauf
+    Jeder Freisteller wird nur einmal geladen und skaliert, die Ziele werden parallel
+    gerendert und in output_folder/<Zielname>/ gespeichert
+    targets: Liste von Target (siehe targets.py)
+    workers: Threads für die Ziele (Standard: Anzahl Ziele, höchstens CPU-Kerne)
+    cutout_files: nur diese Freisteller rendern (--watch), sonst alle im cutout_folder
+    """
+    if cutout_files is None:
+        cutout_files = sorted(Path(cutout_folder).glob('*_cutout.png'))
+
+    # Hintergründe nur einmal dekodieren, ein Ordner pro Ziel
+    templates, bg_hashes, output_folders = {}, {}, {}
+    for target in targets:
+        templates[target.name] = load_background_template(target.background)
+        if cache is not None:
+            bg_hashes[target.name] = file_hash(target.background)
+        output_folders[target.name] = Path(output_folder) / target.name
+        output_folders[target.name].mkdir(parents=True, exist_ok=True)
+        logger.info("🎯 Ziel '%s': %s, Position: %s, %s", target.name, target.background.name,
+                    target.position, 'mit Text' if target.add_text else 'ohne Text')
+
+    # Jedes Ziel hat einen eigenen Cache-Bereich
+    stages = {target.name: f"target:{target.name}" for target in targets}
+    if cache is not None:
+        for target in targets:
+            for removed in cache.prune(stages[target.name]):
+                logger.info("  🗑 Entfernt (Freisteller gelöscht): %s/%s", target.name, removed.name)
+
+    logger.info("Kombiniere %s Spieler mit %s Zielen...", len(cutout_files), len(targets))
+
+    def render(target, player, offset, frame_size, cutout_file):
+        timer = StageTimer()
+        background = compose_player(templates[target.name], player, cutout_file.name, target.position,
+                                    target.add_text, font_path, number_size, name_size, max_height,
+                                    timer, offset, frame_size)
+        output_file = output_folders[target.name] / f"{cutout_file.stem.replace('_cutout', '')}_final.jpg"
+        with timer.stage('encode'):
+            background.save(output_file, 'JPEG', quality=95)
+        return output_file, timer.stages
+
+    workers = workers or min(len(targets), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i, cutout_file in enumerate(cutout_files, 1):
+            logger.debug("Kombiniere (%s/%s): %s", i, len(cutout_files), cutout_file.name)
+
+            # Nur Ziele rendern, deren Ergebnis veraltet ist
+            keys = {}
+            pending = []
+            source_hash = file_hash(cutout_file) if cache is not None else None
+            for target in targets:
+                if cache is not None:
+                    keys[target.name] = settings_key(
+                        source_hash, background=bg_hashes[target.name], position=target.position,
+                        max_height=max_height, text=target.add_text, font=font_path,
+                        number_size=number_size, name_size=name_size)
+                    if cache.is_fresh(stages[target.name], cutout_file, keys[target.name]):
+                        if metrics is not None:
+                            metrics.record(stages[target.name], cutout_file, 'skipped')
+                        continue
+                pending.append(target)
+            if not pending:
+                logger.info("  ⏭ Unverändert, übersprungen: %s", cutout_file.name)
+                continue
+
+            # Einmal laden und skalieren, alle Ziele teilen sich den skalierten Spieler
+            timer = StageTimer()
+            try:
+                with timer.stage('decode'):
+                    player, offset, frame_size = load_cutout(cutout_file)
+                with timer.stage('resize'):
+                    player, offset, frame_size = fit_cutout(player, offset, frame_size, max_height)
+            except Exception as e:
+                logger.error("  ✗ Fehler bei %s: %s", cutout_file.name, e)
+                if metrics is not None:
+                    metrics.record('target-load', cutout_file, 'error', timer.stages, error=e)
+                continue
+            if metrics is not None:
+                metrics.record('target-load', cutout_file, 'ok', timer.stages, targets=len(pending))
+
+            futures = [(target, executor.submit(render, target, player, offset, frame_size, cutout_file))
+                       for target in pending]
+            for target, future in futures:
+                try:
+                    output_file, target_stages = future.result()
+                except Exception as e:
+                    logger.error("  ✗ Fehler bei %s (%s): %s", cutout_file.name, target.name, e)
+                    if metrics is not None:
+                        metrics.record(stages[target.name], cutout_file, 'error', error=e)
+                    continue
+                logger.info("  ✓ %s → %s/%s", cutout_file.name, target.name, output_file.name)
+                if cache is not None:
+                    cache.record(stages[target.name], cutout_file, keys[target.name], [output_file])
+                if metrics is not None:
+                    metrics.record(stages[target.name], cutout_file, 'ok', target_stages, output_file)
+
+    logger.info("\n🎉 Kombinierung abgeschlossen! %s Spieler × %s Ziele.", len(cutout_files), len(targets))
+
+def stream_batch(input_folder, bg_folder, output_folder, cutout_folder=None, player_position='center', add_text=True, font_path=None, number_size=120, name_size=60, threads=None, queue_size=4, model_name=DEFAULT_MODEL, cache=None, target_height=None, mask_height=DEFAULT_MASK_HEIGHT, max_height=PLAYER_MAX_HEIGHT, metrics=None, mask_cache=None, inter_op_threads=None, matting=None):
+    """
+    Streaming-Modus: Freistellen, Kombinieren und JPEG-Kodierung im Speicher,
+    ohne die Freisteller als PNG zu speichern und wieder zu laden
+    cutout_folder: wenn gesetzt, werden die Freisteller zusätzlich (zugeschnitten) gespeichert
+    metrics: MetricsWriter, ein Datensatz pro Bild
+    mask_cache: MaskCache, für Bilder mit gespeicherter Maske läuft das Modell nicht erneut
+    matting: MattingParams, Kanten der Maske per Alpha-Matting verfeinern (nur mit target_height)
+    """
+    # Lädt das Modell, daher erst hier importieren
+    from streaming import stream_pipeline
+
+    image_files = find_input_images(input_folder)
+    logger.info("Gefunden: %s Bilder zum Verarbeiten", len(image_files))
+
+    bg_file = find_background(bg_folder)
+    if bg_file is None:
+        return
+
+    # Hintergrund nur einmal dekodieren
+    template = load_background_template(bg_file)
+
+    # Unveränderte Bilder überspringen, Ergebnisse gelöschter Bilder entfernen
+    keys = {}
+    if cache is not None:
+        settings = {'position': player_position, 'max_height': max_height, 'text': add_text,
+                    'font': font_path, 'number_size': number_size, 'name_size': name_size,
+                    'model': model_id(model_name), 'cutouts': bool(cutout_folder), 'crop': True,
+                    'target_height': target_height, 'mask_height': mask_height}
+        if matting is not None:
+            settings['matting'] = list(matting)
+        bg_hash = file_hash(bg_file)
+        for removed in cache.prune('stream'):
+            logger.info("  🗑 Entfernt (Quelle gelöscht): %s", removed.name)
+        for image_file in image_files:
+            keys[image_file] = settings_key(file_hash(image_file), background=bg_hash, **settings)
+        skipped = [f for f in image_files if cache.is_fresh('stream', f, keys[f])]
+        if skipped:
+            logger.info("Unverändert, übersprungen: %s", len(skipped))
+        if metrics is not None:
+            for image_file in skipped:
+                metrics.record('stream', image_file, 'skipped')
+        image_files = [f for f in image_files if f not in skipped]
+
+    def compose(player, image_file, timer):
+        return compose_player(template, player, image_file.name, player_position,
+                              add_text, font_path, number_size, name_size, max_height, timer)
+
+    results = stream_pipeline(image_files, compose, output_folder, cutout_folder,
+                              model_name, threads, queue_size,
+                              target_height=target_height, mask_height=mask_height,
+                              mask_cache=mask_cache, inter_op_threads=inter_op_threads,
+                              matting=matting)
+    written = 0
+    for i, (image_file, output_file, error, stages) in enumerate(results, 1):
+        if error is None:
+            written += 1
+            logger.info("  ✓ (%s/%s) %s → %s", i, len(image_files), image_file.name, output_file.name)
+            if cache is not None:
+                outputs = [output_file]
+                if cutout_folder:
+                    outputs.append(Path(cutout_folder) / f"{image_file.stem}_cutout.png")
+                cache.record('stream', image_file, keys[image_file], outputs)
+        else:
+            logger.error("  ✗ (%s/%s) Fehler bei %s: %s", i, len(image_files), image_file.name, error)
+        if metrics is not None:
+            metrics.record('stream', image_file, 'ok' if error is None else 'error',
+                           stages, output_file, error)
+
+    # Übersprungene Bilder stehen schon oben, hier nur die tatsächlich geschriebenen
+    logger.info("\n🎉 Streaming abgeschlossen! %s finale Bilder erstellt.", written)
+
+def collect_team(cutout_folder):
+    """
+    (Nummer, Name, Datei) für alle Freisteller im Ordner
+    """
+    entries = []
+    for cutout_file in sorted(Path(cutout_folder).glob('*_cutout.png')):
+        name, number = extract_player_info(cutout_file.name)
+        entries.append((number, name, cutout_file))
+    return entries
+
+def create_team_outputs(cutout_folder, bg_folder, team_image=None, contact_sheet=None, team_size=TEAM_SIZE,
+                        team_columns=None, sheet_grid=(5, 6), add_text=True, font_path=None):
+    """
+    Mannschaftsbild und/oder Kontaktbogen aus den vorhandenen Freistellern
+    Die Freisteller werden einzeln geladen, nie alle gleichzeitig
+    """
+    entries = collect_team(cutout_folder)
+    if not entries:
+        logger.error("❌ Keine Freisteller in %s gefunden!", cutout_folder)
+        return
+
+    if team_image:
+        bg_files = find_backgrounds(bg_folder) if Path(bg_folder).exists() else []
+        background = None
+        if bg_files:
+            with Image.open(bg_files[0]) as bg:
+                background = bg.convert('RGB')
+        canvas = render_team(entries, team_size, background, team_columns, labels=add_text, font_path=font_path)
+        del background
+        Path(team_image).parent.mkdir(parents=True, exist_ok=True)
+        canvas.save(team_image, quality=92, dpi=(300, 300))
+        logger.info("✓ Mannschaftsbild: %s (%s Spieler, %sx%s)", team_image, len(entries), *team_size)
+
+    if contact_sheet:
+        Path(contact_sheet).parent.mkdir(parents=True, exist_ok=True)
+        columns, rows = sheet_grid
+        pages = write_contact_sheet(entries, contact_sheet, columns=columns, rows=rows, font_path=font_path)
+        logger.info("✓ Kontaktbogen: %s (%s Spieler)", ', '.join(str(page) for page in pages), len(entries))
+
+def upload_sources(args):
+    """
+    [(Ordner, Präfix im Bucket), ...]: final_results/ und ein eigener Varianten-Ordner unter variants/
+    """
+    final_folder = Path('final_results')
+    sources = [(final_folder, '')]
+    variants_dir = Path(args.variants_dir)
+    if not variants_dir.resolve().is_relative_to(final_folder.resolve()):
+        sources.append((variants_dir, 'variants/'))
+    return sources
+
+def variants_url(args):
+    """
+    URL-Präfix der Varianten: --variants-url oder die öffentliche Adresse, unter der --upload sie ablegt
+    """
+    if args.variants_url:
+        return args.variants_url
+    final_folder, variants_dir = Path('final_results').resolve(), Path(args.variants_dir).resolve()
+    folder = variants_dir.relative_to(final_folder).as_posix() if variants_dir.is_relative_to(final_folder) \
+        else 'variants'
+    return public_url(args.s3_bucket, args.s3_prefix.strip('/') + '/' + folder)
+
+def upload_results(args, metrics=None):
+    """
+    final_results/ und einen eigenen Varianten-Ordner in den S3-Bucket laden (nur Geändertes)
+    """
+    sources = upload_sources(args)
+    prefix = args.s3_prefix.strip('/') + '/' if args.s3_prefix.strip('/') else ''
+
+    logger.info("\n☁️ Lade nach s3://%s/%s%s...", args.s3_bucket, prefix,
+                ' (nur Anzeige)' if args.dry_run else '')
+    try:
+        # Der Kader-Index enthält lokale Pfade und gehört nicht in den öffentlichen Bucket
+        summary = upload_folders(sources, args.s3_bucket, prefix, args.s3_endpoint, workers=args.upload_workers,
+                                 delete=args.upload_delete, dry_run=args.dry_run, metrics=metrics,
+                                 exclude=[args.roster])
+    except Exception as e:
+        # Fehlendes boto3, keine Zugangsdaten, Bucket nicht erreichbar
+        logger.error("❌ Upload fehlgeschlagen: %s", e)
+        return None
+    logger.info("☁️ %s hochgeladen (%.1f MB), %s unverändert, %s entfernt, %s Fehler",
+                summary['uploaded'], summary['bytes'] / 1e6, summary['skipped'], summary['deleted'],
+                summary['errors'])
+    return summary
+
+def finish_variants(variants, existing_stems):
+    """
+    Wartet auf die Bildvarianten und schreibt das Datenfile für Hugo
+    """
+    errors = variants.finish(existing_stems)
+    for stem, error in errors.items():
+        logger.error("  ✗ Fehler bei Varianten für %s: %s", stem, error)
+    logger.info("🖼 Varianten: %s/, Datenfile: %s", variants.output_folder, variants.data_file)
+
+def create_sample_background():
+    """
+    Erstellt ein Beispiel-Hintergrundbild falls keines vorhanden
+    """
+    bg_path = Path('backgrounds')
+    if not any(bg_path.glob('*')):
+        logger.info("Erstelle Beispiel-Hintergrund...")
+
+        # Einfacher Gradient-Hintergrund (dunkelblau, von oben nach unten heller)
+        img = generate_background('linear', (1200, 1600), DEFAULT_COLORS)
+
+        sample_bg = bg_path / 'sample_background.jpg'
+        img.save(sample_bg, 'JPEG')
+        logger.info("✓ Beispiel-Hintergrund erstellt: %s", sample_bg)
+
+def create_generated_background(style, size, colors):
+    """
+    Erzeugt einen prozeduralen Hintergrund in backgrounds/
+    """
+    img = generate_background(style, size, colors)
+    output_file = Path('backgrounds') / f"generated_{style}_{size[0]}x{size[1]}.jpg"
+    img.save(output_file, 'JPEG', quality=95)
+    logger.info("✓ Hintergrund erzeugt: %s (%s, %s Farben)", output_file, style, len(colors))
+    return output_file
+
+def build_parser(**defaults):
+    """
+    Gemeinsame Kommandozeile, defaults überschreiben die Voreinstellungen
+    (z.B. add_text=False, max_height=1300 für mannschaftsfotos.py)
+    """
+    parser = argparse.ArgumentParser(description='Automatische Mannschaftsfoto-Verarbeitung')
+    parser.add_argument('--setup', action='store_true', help='Nur Ordner erstellen')
+    parser.add_argument('--cutout-only', action='store_true', help='Nur Freisteller erstellen')
+    parser.add_argument('--combine-only', action='store_true', help='Nur kombinieren')
+    parser.add_argument('--position', choices=['center', 'bottom', 'top'],
+                       default='center', help='Position des Spielers')
+    parser.add_argument('--target', type=parse_target, action='append', default=[],
+                       metavar='NAME=HINTERGRUND[:POSITION][:text|notext]',
+                       help='Zusätzliches Ausgabeziel, mehrfach möglich (z.B. heim=backgrounds/heim.jpg:bottom); '
+                            'Ergebnisse landen in final_results/NAME/')
+    parser.add_argument('--all-backgrounds', action='store_true',
+                       help='Ein Ziel pro Bild in backgrounds/ (Ordner nach dem Dateinamen)')
+    parser.add_argument('--max-height', type=int,
+                       help=f'Maximale Höhe der Spieler im finalen Bild (Standard: {defaults.get("max_height", PLAYER_MAX_HEIGHT)})')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Parallele Freisteller-Prozesse (0 = alle CPU-Kerne, Standard: 1)')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='ONNX-Threads pro Worker (Standard: CPU-Kerne / Worker)')
+    parser.add_argument('--numpy-compose', metavar='N', type=int, nargs='?', const=8, default=None,
+                       help='Spieler in Stapeln zu N mit NumPy kombinieren statt einzeln mit Pillow '
+                            '(pixelgleich, Standard: 8)')
+    parser.add_argument('--compose-workers', type=int, default=1,
+                       help='Parallele Prozesse fürs Kombinieren, die Vorlage liegt im Shared Memory '
+                            '(0 = alle CPU-Kerne, Standard: 1)')
+    parser.add_argument('--intra-op-threads', dest='threads', type=int,
+                       help='onnxruntime intra_op_num_threads pro Worker (gleichbedeutend mit --threads)')
+    parser.add_argument('--inter-op-threads', type=int, default=None,
+                       help='onnxruntime inter_op_num_threads pro Worker (Standard: Vorgabe von onnxruntime)')
+    parser.add_argument('--model', default=DEFAULT_MODEL,
+                       help=f'Segmentierungsmodell (z.B. u2netp, silueta, isnet-general-use) oder Pfad zu einer '
+                            f'.onnx-Datei, z.B. int8-quantisiert (Standard: {DEFAULT_MODEL}, '
+                            f'Vergleich: benchmarks/bench_models.py)')
+    parser.add_argument('--force', action='store_true',
+                       help='Cache ignorieren und alle Bilder neu erstellen')
+    parser.add_argument('--watch', action='store_true',
+                       help='Nach dem Durchlauf input_players/ und backgrounds/ überwachen und '
+                            'neue oder geänderte Fotos sofort verarbeiten (Modell bleibt geladen)')
+    parser.add_argument('--watch-settle', type=float, default=DEFAULT_SETTLE,
+                       help=f'Sekunden ohne Änderung, bevor eine Datei als fertig hochgeladen gilt (Standard: {DEFAULT_SETTLE})')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Nur Plan ausgeben: Reihenfolge, Cache-Status und geschätzte Dauer (liest nur Dateiköpfe)')
+    parser.add_argument('--roster', default=ROSTER_FILE,
+                       help=f'Kader-Index mit Name, Nummer und Bilddaten (z.B. ../hugo/esc/data/team-roster.json, Standard: {ROSTER_FILE})')
+    parser.add_argument('--upload', action='store_true',
+                       help='Nach dem Lauf final_results/ (inkl. Varianten) in den S3-Bucket laden, nur geänderte Dateien')
+    parser.add_argument('--upload-only', action='store_true',
+                       help='Nur final_results/ hochladen (mit --dry-run: nur anzeigen)')
+    parser.add_argument('--s3-bucket', default=DEFAULT_BUCKET,
+                       help=f'Ziel-Bucket (Standard: {DEFAULT_BUCKET}, wie params.s3 in hugo/esc/config.toml)')
+    parser.add_argument('--s3-prefix', default=DEFAULT_PREFIX,
+                       help=f'Präfix der Schlüssel im Bucket, getrennt von den Galerie-Bildern (Standard: {DEFAULT_PREFIX})')
+    parser.add_argument('--s3-endpoint', default=None,
+                       help='S3-kompatibler Endpunkt, z.B. http://localhost:9000 für MinIO '
+                            '(Standard: AWS bzw. AWS_ENDPOINT_URL)')
+    parser.add_argument('--upload-workers', type=int, default=UPLOAD_WORKERS,
+                       help=f'Parallele Uploads (Standard: {UPLOAD_WORKERS})')
+    parser.add_argument('--upload-delete', action='store_true',
+                       help='Objekte unter --s3-prefix löschen, die es lokal nicht mehr gibt (nicht mit leerem Präfix)')
+    parser.add_argument('--serve', action='store_true',
+                       help='Lokalen HTTP-Dienst starten (POST /api/cutout und /api/card, GET /metrics)')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse des Dienstes (Standard: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port des Dienstes (Standard: 8765)')
+    parser.add_argument('--max-batch', type=int, default=4,
+                       help='Höchstens so viele gleichzeitige Anfragen in einem Modellaufruf (Standard: 4)')
+    parser.add_argument('--batch-wait-ms', type=float, default=10,
+                       help='So lange auf weitere Anfragen für einen Stapel warten (Standard: 10 ms)')
+    parser.add_argument('--max-inflight', type=int, default=8,
+                       help='Gleichzeitig bearbeitete Anfragen, weitere bekommen 503 (Standard: 8)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Freistellen, Kombinieren und Speichern im Speicher verketten (ohne PNG-Zwischenschritt)')
+    parser.add_argument('--keep-cutouts', action='store_true',
+                       help='Im Streaming-Modus die Freisteller zusätzlich speichern')
+    parser.add_argument('--queue-size', type=int, default=4,
+                       help='Größe der Queues zwischen den Streaming-Stufen (Standard: 4)')
+    parser.add_argument('--working-resolution', action='store_true',
+                       help='Maske auf reduzierter Auflösung berechnen, nur den Alphakanal hochskalieren')
+    parser.add_argument('--mask-height', type=int, default=DEFAULT_MASK_HEIGHT,
+                       help=f'Höhe für die Maskenberechnung (Standard: {DEFAULT_MASK_HEIGHT})')
+    parser.add_argument('--matting', metavar='BAND[:FG:BG]', type=parse_matting, nargs='?', const='',
+                       help='Kanten der Maske per Alpha-Matting verfeinern, nur im unsicheren Band und auf '
+                            'Arbeitsauflösung, gecacht pro Bild (braucht --working-resolution und pymatting, '
+                            'Standard: 6:240:10, Vergleich: benchmarks/bench_matting.py)')
+    parser.add_argument('--mask-cache', default=MASK_CACHE_DIR,
+                       help=f'Ordner für gecachte Masken pro Eingabebild (Standard: {MASK_CACHE_DIR})')
+    parser.add_argument('--variants', action='store_true',
+                       help='Responsive Varianten (WebP/JPEG) und Datenfile für Hugo schreiben')
+    parser.add_argument('--variants-only', action='store_true',
+                       help='Nur Varianten aus den vorhandenen finalen Bildern erzeugen')
+    parser.add_argument('--variant-widths', type=parse_widths, default=DEFAULT_WIDTHS,
+                       help='Breiten der Varianten, kommagetrennt (Standard: 320,640,1280)')
+    parser.add_argument('--variant-formats', type=parse_formats, default=DEFAULT_FORMATS,
+                       help=f'Formate der Varianten, kommagetrennt: avif, webp, jpg '
+                            f'(Standard: {",".join(DEFAULT_FORMATS)})')
+    parser.add_argument('--max-bytes', type=parse_bytes, default=None,
+                       help='Byte-Budget pro Variante, z.B. 150k (Qualität wird pro Bild gesucht)')
+    parser.add_argument('--min-ssim', type=float, default=None,
+                       help='Mindest-SSIM pro Variante, z.B. 0.98 (niedrigste Qualität, die das erreicht)')
+    parser.add_argument('--variants-dir', default='final_results/variants',
+                       help='Zielordner der Varianten (z.B. ../hugo/esc/static/images/players)')
+    parser.add_argument('--variants-data', default='final_results/player_images.json',
+                       help='JSON-Datenfile für Hugo (z.B. ../hugo/esc/data/player_images.json)')
+    parser.add_argument('--variants-url', default=None,
+                       help='URL-Präfix der Varianten auf der Seite, z.B. /images/players mit --variants-dir '
+                            '../hugo/esc/static/images/players (Standard: Adresse im Bucket, unter der --upload '
+                            'sie ablegt, z.B. https://esc.s3.kuepper.nrw/spieler/variants)')
+    parser.add_argument('--team-image', metavar='DATEI', nargs='?', const='final_results/mannschaft.jpg',
+                       help='Nur Mannschaftsbild aus den vorhandenen Freistellern erzeugen '
+                            '(Standard: final_results/mannschaft.jpg)')
+    parser.add_argument('--contact-sheet', metavar='DATEI', nargs='?', const='final_results/kontaktbogen.pdf',
+                       help='Nur Kontaktbogen (A4, 300 dpi) aus den vorhandenen Freistellern erzeugen, '
+                            '.pdf mehrseitig, sonst ein Bild pro Seite (Standard: final_results/kontaktbogen.pdf)')
+    parser.add_argument('--team-size', type=parse_size, default=TEAM_SIZE,
+                       help=f'Größe des Mannschaftsbilds (Standard: {TEAM_SIZE[0]}x{TEAM_SIZE[1]})')
+    parser.add_argument('--team-columns', type=int,
+                       help='Spieler pro Reihe im Mannschaftsbild (Standard: automatisch)')
+    parser.add_argument('--sheet-grid', type=parse_size, default=(5, 6),
+                       help='Spalten x Zeilen pro Kontaktbogen-Seite (Standard: 5x6)')
+    parser.add_argument('--generate-background', choices=STYLES,
+                       help='Prozeduralen Hintergrund in backgrounds/ erzeugen')
+    parser.add_argument('--bg-size', type=parse_size, default=(1200, 1600),
+                       help='Größe des erzeugten Hintergrunds (Standard: 1200x1600)')
+    parser.add_argument('--bg-colors', type=parse_colors, default=parse_colors(DEFAULT_COLORS),
+                       help='Farben des Verlaufs, kommagetrennt (z.B. "#1e3a8a,#ffffff")')
+    parser.add_argument('--no-text', dest='add_text', action='store_false', help='Keinen Text hinzufügen')
+    parser.add_argument('--text', dest='add_text', action='store_true', help='Name und Nummer hinzufügen')
+    parser.add_argument('--font', type=str, help='Pfad zu einer TTF-Schriftdatei')
+    parser.add_argument('--number-size', type=int, default=120, help='Schriftgröße für Nummer (Standard: 120)')
+    parser.add_argument('--name-size', type=int, default=60, help='Schriftgröße für Namen (Standard: 60)')
+    parser.add_argument('--quiet', action='store_true', help='Nur Warnungen und Fehler ausgeben')
+    parser.add_argument('--verbose', action='store_true', help='Zusätzlich Debug-Ausgaben pro Bild')
+    parser.add_argument('--metrics', metavar='DATEI',
+                       help='Pro Bild einen JSON-Datensatz mit Stufen-Dauern, Größen und Fehlern schreiben (JSON Lines)')
+    parser.add_argument('--profile', metavar='PRÄFIX', nargs='?', const='profile',
+                       help='Lauf mit cProfile und tracemalloc messen, schreibt PRÄFIX.prof und PRÄFIX.txt')
+    parser.set_defaults(add_text=True, max_height=PLAYER_MAX_HEIGHT)
+    parser.set_defaults(**defaults)
+    return parser
+
+def main(argv=None, **defaults):
+    parser = build_parser(**defaults)
+    args = parser.parse_args(argv)
+    if (args.target or args.all_backgrounds) and (args.stream or args.variants or args.variants_only):
+        parser.error('--target/--all-backgrounds arbeiten mit den gespeicherten Freistellern '
+                     'und lassen sich nicht mit --stream oder --variants kombinieren')
+    if args.watch and (args.stream or args.combine_only or args.variants_only):
+        parser.error('--watch lässt sich nicht mit --stream, --combine-only oder --variants-only kombinieren')
+    if args.numpy_compose is not None and (args.numpy_compose < 1 or args.compose_workers != 1):
+        parser.error('--numpy-compose braucht N >= 1 und läuft im Hauptprozess (ohne --compose-workers)')
+    if args.upload_delete and not args.s3_prefix.strip('/'):
+        parser.error('--upload-delete braucht ein eigenes --s3-prefix, sonst würden die Galerie-Bilder gelöscht')
+    if args.matting is not None and (not args.working_resolution or args.serve):
+        parser.error('--matting braucht --working-resolution und läuft nicht mit --serve')
+    if args.model.endswith('.onnx') and not Path(args.model).is_file():
+        parser.error(f'Modelldatei nicht gefunden: {args.model}')
+    setup_logging(args.quiet, args.verbose)
+
+    metrics = MetricsWriter(args.metrics) if args.metrics else None
+    try:
+        if args.profile:
+            with profiled(args.profile):
+                run(args, metrics)
+        else:
+            run(args, metrics)
+    finally:
+        if metrics is not None:
+            metrics.close()
+            logger.info("📈 Messwerte: %s", args.metrics)
+
+def run(args, metrics=None):
+    """
+    Führt die gewählten Schritte mit den geparsten Argumenten aus
+    """
+    logger.info("🏆 Mannschaftsfoto-Prozessor gestartet!")
+    logger.info("=" * 50)
+
+    if args.dry_run:
+        # Nur lesen: keine Ordner, Hintergründe, Caches oder Kader-Index schreiben
+        dry_run(args, metrics)
+        return
+
+    # Ordner erstellen
+    setup_directories()
+
+    if args.setup:
+        logger.info("\n📁 Ordner-Setup abgeschlossen!")
+        logger.info("\nNächste Schritte:")
+        logger.info("1. Spielerbilder in 'input_players/' kopieren")
+        logger.info("   Format: 'Nummer_Vorname_Nachname.jpg' (z.B. '36_Moritz_Breves.jpg')")
+        logger.info("2. Hintergrundbilder in 'backgrounds/' kopieren")
+        logger.info("3. Script ohne --setup nochmal ausführen")
+        return
+
+    # Gewünschten Hintergrund erzeugen
+    if args.generate_background:
+        create_generated_background(args.generate_background, args.bg_size, args.bg_colors)
+
+    # Beispiel-Hintergrund erstellen falls nötig
+    create_sample_background()
+
+    # Build-Cache laden (mit --force wird alles neu erstellt)
+    cache = PipelineCache(enabled=not args.force)
+    mask_cache = MaskCache(args.mask_cache, enabled=not args.force)
+
+    # Responsive Varianten für die Hugo-Seite
+    variants = None
+    if args.variants or args.variants_only:
+        variants = VariantWriter(args.variants_dir, args.variants_data, variants_url(args),
+                                 args.variant_widths, args.variant_formats,
+                                 target=EncodeTarget(args.max_bytes, args.min_ssim))
+
+    if args.serve:
+        from service import CutoutService, serve
+        _, threads = resolve_workers(1, args.threads)
+        service = CutoutService('backgrounds', mask_cache, args.max_batch, args.batch_wait_ms / 1000,
+                                args.max_inflight, args.mask_height, metrics=metrics,
+                                position=args.position, add_text=args.add_text, font_path=args.font,
+                                number_size=args.number_size, name_size=args.name_size,
+                                max_height=args.max_height, model_name=args.model)
+        serve(service, args.host, args.port, threads, args.inter_op_threads)
+        return
+
+    if args.team_image or args.contact_sheet:
+        logger.info("\n👥 Erzeuge Mannschaftsbild/Kontaktbogen aus output_cutouts/...")
+        create_team_outputs('output_cutouts', 'backgrounds', args.team_image, args.contact_sheet,
+                            args.team_size, args.team_columns, args.sheet_grid, args.add_text, args.font)
+        return
+
+    if args.upload_only:
+        upload_results(args, metrics)
+        return
+
+    if args.variants_only:
+        logger.info("\n🖼 Erzeuge Varianten aus final_results/...")
+        finish_variants(variants, write_variants_for_folder('final_results', variants))
+        return
+
+    # Mit --working-resolution entstehen die Freisteller direkt in Zielhöhe
+    target_height = args.max_height if args.working_resolution else None
+
+    # Katalog aus den Dateiköpfen: Größen, Hashes, Name/Nummer und Probleme vor dem Lauf
+    catalog = None
+    if not args.combine_only:
+        catalog = catalog_inputs('input_players', args.roster, target_height, check_names=args.add_text)
+
+    if args.stream:
+        # Alle Schritte in einem Durchlauf, verbunden über Queues
+        logger.info("\n🚀 Streaming: Freistellen → Kombinieren → Speichern (Position: %s)...", args.position)
+        stream_batch('input_players', 'backgrounds', 'final_results',
+                     'output_cutouts' if args.keep_cutouts else None,
+                     args.position, args.add_text, args.font, args.number_size, args.name_size,
+                     args.threads, args.queue_size, args.model, cache=cache,
+                     target_height=target_height, mask_height=args.mask_height,
+                     max_height=args.max_height, metrics=metrics, mask_cache=mask_cache,
+                     inter_op_threads=args.inter_op_threads, matting=args.matting)
+        cache.save()
+        if variants is not None:
+            # Im Streaming-Modus liegen die finalen Bilder erst als Datei vor
+            finish_variants(variants, write_variants_for_folder('final_results', variants))
+
+    # Mehrere Ziele (Hintergrund, Position, Text) in einem Durchlauf
+    targets = list(args.target)
+    if args.all_backgrounds:
+        targets.extend(targets_for_backgrounds(find_backgrounds('backgrounds')))
+    if targets and not args.cutout_only:
+        try:
+            targets = resolve_targets(targets, args.position, args.add_text)
+        except ValueError as e:
+            logger.error("❌ %s", e)
+            return
+
+    if not args.stream:
+        process_players(args, cache, mask_cache, metrics, variants, targets, target_height, catalog=catalog)
+    if args.upload:
+        upload_results(args, metrics)
+
+    logger.info("\n✨ Alle Schritte abgeschlossen!")
+    logger.info("\nErgebnisse:")
+    logger.info("- Freigestellte Spieler: output_cutouts/")
+    logger.info("- Finale Mannschaftsbilder: final_results/")
+    if args.add_text:
+        logger.info("\n💡 Tipp: Dateinamen sollten Format 'Nummer_Vorname_Nachname.jpg' haben")
+        logger.info("   Beispiel: '36_Moritz_Breves.jpg' → Name: 'Moritz Breves', Nummer: '36'")
+
+    if args.watch:
+        watch(args, cache, mask_cache, metrics, variants, targets, target_height)
+
+def dry_run(args, metrics=None):
+    """
+    --dry-run: Plan der Freisteller bzw. mit --upload-only die geplanten Uploads, ohne etwas zu schreiben
+    """
+    if args.upload_only:
+        upload_results(args, metrics)
+        return
+    target_height = args.max_height if args.working_resolution else None
+    catalog = []
+    if Path('input_players').is_dir() and not args.combine_only:
+        catalog = catalog_inputs('input_players', args.roster, target_height, write=False,
+                                 check_names=args.add_text)
+    workers, _ = resolve_workers(1 if args.stream else args.workers, args.threads)
+    print_plan(catalog, PipelineCache(enabled=not args.force), MaskCache(args.mask_cache, enabled=not args.force),
+               workers, args.model, target_height=target_height, mask_height=args.mask_height,
+               matting=args.matting)
+
+def process_players(args, cache, mask_cache, metrics=None, variants=None, targets=(), target_height=None,
+                    workers=None, image_files=None, cutout_files=None, catalog=None):
+    """
+    Schritt 1 (Freisteller) und Schritt 2 (Kombinieren) gemäß Kommandozeile
+    image_files/cutout_files: nur diese Dateien verarbeiten (--watch), None = alle
+    catalog: Katalog der Eingaben (Hashes, größte Bilder zuerst)
+    """
+    if not args.combine_only:
+        # Schritt 1: Freisteller erstellen
+        logger.info("\n🎯 Schritt 1: Hintergrund entfernen...")
+        remove_background_batch('input_players', 'output_cutouts', args.workers if workers is None else workers,
+                                args.threads, args.model, cache=cache, target_height=target_height,
+                                mask_height=args.mask_height, metrics=metrics, mask_cache=mask_cache,
+                                image_files=image_files, catalog=catalog, inter_op_threads=args.inter_op_threads,
+                                matting=args.matting)
+        cache.save()
+
+    if args.cutout_only:
+        return
+    if cutout_files is not None:
+        # Fehlgeschlagene Freisteller fehlen
+        cutout_files = [cutout_file for cutout_file in cutout_files if cutout_file.exists()]
+
+    if targets:
+        logger.info("\n🖼️ Schritt 2: Mit %s Zielen kombinieren...", len(targets))
+        combine_targets('output_cutouts', targets, 'final_results', args.font, args.number_size,
+                        args.name_size, cache=cache, max_height=args.max_height, metrics=metrics,
+                        cutout_files=cutout_files)
+    else:
+        # Schritt 2: Mit Hintergrund kombinieren
+        text_info = "mit Text" if args.add_text else "ohne Text"
+        logger.info("\n🖼️ Schritt 2: Mit Hintergrund kombinieren (%s, Position: %s)...", text_info, args.position)
+        combine_with_background('output_cutouts', 'backgrounds', 'final_results',
+                               args.position, args.add_text, args.font, args.number_size, args.name_size,
+                               cache=cache, variants=variants, max_height=args.max_height, metrics=metrics,
+                               cutout_files=cutout_files, workers=args.compose_workers or os.cpu_count() or 1,
+                               batch_size=args.numpy_compose)
+    cache.save()
+
+def watch(args, cache, mask_cache, metrics=None, variants=None, targets=(), target_height=None):
+    """
+    --watch: Modell warm halten und nur neue oder geänderte Fotos verarbeiten
+    Geänderte Hintergründe rendern alle Spieler neu (der Hintergrund ist Teil des Cache-Schlüssels)
+    """
+    input_folder = Path('input_players')
+    bg_folders = [Path('backgrounds')] + [target.background.parent for target in targets]
+
+    # Modell einmal laden, die Stapel laufen danach im Hauptprozess ohne Neustart
+    _, threads = resolve_workers(1, args.threads)
+    logger.info("\n🔥 Lade Modell %s (%s Threads)...", args.model, threads)
+    get_session(args.model, threads, args.inter_op_threads)
+
+    watcher = FolderWatcher([input_folder, *bg_folders], SUPPORTED_FORMATS | BACKGROUND_FORMATS,
+                            settle=args.watch_settle)
+    logger.info("👀 Warte auf neue Bilder in %s/ (Strg+C beendet)...", input_folder)
+    try:
+        for ready, removed in watcher.changes():
+            start = time.perf_counter()
+            inputs = [path for path in ready if path.parent == input_folder]
+            backgrounds_changed = any(path.parent != input_folder for path in ready + removed)
+            logger.info("\n🔄 %s neue/geänderte, %s gelöschte Dateien", len(ready), len(removed))
+
+            # Neuer Hintergrund: alle Spieler, sonst nur die Freisteller der neuen Fotos
+            cutout_files = None
+            if not backgrounds_changed:
+                cutout_files = [Path('output_cutouts') / f"{path.stem}_cutout.png" for path in inputs]
+            # Unveränderte Dateien übernimmt der Katalog ohne neuen Hash
+            catalog = catalog_inputs(input_folder, args.roster, target_height, check_names=args.add_text)
+            process_players(args, cache, mask_cache, metrics, variants, targets, target_height,
+                            workers=1, image_files=inputs, cutout_files=cutout_files, catalog=catalog)
+            if args.upload:
+                upload_results(args, metrics)
+            logger.info("⏱ Aktualisiert in %.2f s", time.perf_counter() - start)
+    except KeyboardInterrupt:
+        logger.info("\n👋 Überwachung beendet")
+    finally:
+        watcher.close()
+        cache.save()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Freisteller-Engine für Mannschaftsfotos
+Lädt das rembg/ONNX-Modell nur einmal pro Worker und verteilt die Bilder
+auf einen Prozess-Pool. Masken werden pro Eingabebild gecacht (siehe cutout_store)
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from cutout_store import save_cutout
+from instrumentation import StageTimer
+from pipeline_cache import file_hash
+
+DEFAULT_MODEL = 'u2net'
+
+# Höhe, auf der die Maske berechnet wird (das Modell selbst arbeitet mit 320x320)
+DEFAULT_MASK_HEIGHT = 1024
+
+# EXIF-Orientierungen, bei denen Breite und Höhe vertauscht sind
+_SWAPPED_ORIENTATIONS = {5, 6, 7, 8}
+
+# rembg-Sessions mit 320x320-Eingang und ImageNet-Normierung (wie U2netSession.predict)
+_U2NET_SESSIONS = {'U2netSession', 'U2netpSession', 'U2netHumanSegSession', 'SiluetaSession'}
+
+logger = logging.getLogger(__name__)
+
+# Pro Prozess genau eine Session, Modell und Threads setzt der Worker-Initializer
+_session = None
+_model_name = DEFAULT_MODEL
+_threads = None
+_inter_op_threads = None
+_matting = None
+_batch_supported = True
+
+
+def resolve_workers(workers, threads=None):
+    """
+    Bestimmt Anzahl der Worker und Threads pro Worker
+    workers=0 bedeutet: alle CPU-Kerne verwenden
+    """
+    cpu_count = os.cpu_count() or 1
+    if not workers or workers < 1:
+        workers = cpu_count
+    if threads is None or threads < 1:
+        # Kerne gleichmäßig aufteilen, damit sich die Worker nicht gegenseitig ausbremsen
+        threads = max(1, cpu_count // workers)
+    return workers, threads
+
+
+def init_worker(model_name=DEFAULT_MODEL, threads=None, inter_op_threads=None, matting=None):
+    """
+    Merkt sich Modell und Threads für diesen Prozess
+    Geladen wird das Modell erst beim ersten Bild, dessen Maske nicht im Cache liegt
+    threads: onnxruntime intra_op_num_threads, inter_op_threads: inter_op_num_threads
+    matting: MattingParams für die Kantenverfeinerung auf Arbeitsauflösung (None = aus)
+    """
+    global _model_name, _threads, _inter_op_threads, _matting
+    _model_name = model_name
+    _threads = threads
+    _inter_op_threads = inter_op_threads
+    _matting = matting
+
+
+def model_home():
+    """
+    Ordner, in dem rembg die Modelle ablegt (U2NET_HOME, sonst ~/.u2net)
+    """
+    return Path(os.getenv('U2NET_HOME', '~/.u2net')).expanduser()
+
+
+def available_models():
+    """
+    Namen aller Modelle, die die installierte rembg-Version kennt
+    """
+    try:
+        from rembg.sessions import sessions_class
+    except ImportError:
+        return [DEFAULT_MODEL]
+    return [session_class.name() for session_class in sessions_class]
+
+
+def installed_models():
+    """
+    Modelle, deren Gewichte schon heruntergeladen sind
+    """
+    return [name for name in available_models() if (model_home() / f"{name}.onnx").exists()]
+
+
+@lru_cache(maxsize=None)
+def model_id(model_name):
+    """
+    Modellname für Cache-Schlüssel und Dateinamen
+    Eigene .onnx-Dateien (z.B. int8-quantisiert) werden über Name und Inhalt unterschieden
+    """
+    if not model_name.endswith('.onnx'):
+        return model_name
+    return f"{Path(model_name).stem}-{file_hash(model_name)[:8]}"
+
+
+def session_options(threads=None, inter_op_threads=None):
+    """
+    onnxruntime-SessionOptions mit eigener Thread-Aufteilung
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+    if inter_op_threads:
+        options.inter_op_num_threads = inter_op_threads
+    return options
+
+
+def create_session(model_name=DEFAULT_MODEL, threads=None, inter_op_threads=None):
+    """
+    Neue rembg-Session mit eigenen SessionOptions
+    new_session setzt beide Thread-Zahlen aus OMP_NUM_THREADS, deshalb wird die
+    Session-Klasse aus rembg.sessions direkt erzeugt
+    model_name: rembg-Modell oder Pfad zu einer .onnx-Datei (läuft als u2net_custom)
+    """
+    # rembg (onnxruntime, scipy, ...) erst laden, wenn wirklich freigestellt wird
+    from rembg import new_session
+
+    kwargs = {}
+    name = model_name
+    if model_name.endswith('.onnx'):
+        name, kwargs = 'u2net_custom', {'model_path': str(Path(model_name).resolve())}
+
+    try:
+        from rembg.sessions import sessions_class
+    except ImportError:
+        # Ältere rembg-Versionen: Threads nur über OMP_NUM_THREADS
+        if threads:
+            os.environ['OMP_NUM_THREADS'] = str(threads)
+        return new_session(name, **kwargs)
+
+    for session_class in sessions_class:
+        if session_class.name() == name:
+            return session_class(name, session_options(threads, inter_op_threads), **kwargs)
+    raise ValueError(f"Unbekanntes Modell '{model_name}' (verfügbar: {', '.join(available_models())})")
+
+
+def get_session(model_name=None, threads=None, inter_op_threads=None):
+    """
+    Liefert die warme Session dieses Prozesses (lädt sie beim ersten Aufruf)
+    """
+    global _session
+    if _session is None:
+        if model_name is not None:
+            init_worker(model_name, threads, inter_op_threads, _matting)
+        _session = create_session(_model_name, _threads, _inter_op_threads)
+    return _session
+
+
+def open_reduced(image_file, target_height):
+    """
+    Öffnet ein Bild möglichst schon verkleinert (JPEG: draft() dekodiert direkt mit 1/2, 1/4, 1/8)
+    Liefert ein korrekt gedrehtes RGB-Bild mit genau target_height (oder kleiner, wenn das Original kleiner ist)
+    """
+    img = Image.open(image_file)
+    height = img.height
+    if img.getexif().get(0x0112, 1) in _SWAPPED_ORIENTATIONS:
+        # Nach dem Drehen wird die Breite zur Höhe
+        height = img.width
+
+    if height > target_height:
+        scale = target_height / height
+        requested = (int(img.width * scale), int(img.height * scale))
+        # draft() wählt die kleinste Stufe, die noch mindestens so groß ist
+        img.draft('RGB', requested)
+
+    img = ImageOps.exif_transpose(img.convert('RGB'))
+    if img.height > target_height:
+        new_width = int(img.width * target_height / img.height)
+        img = img.resize((new_width, target_height), Image.Resampling.LANCZOS)
+    return img
+
+
+def segment_mask(image, image_file=None, mask_height=None, mask_cache=None):
+    """
+    8-Bit-Maske für image, aus dem MaskCache, wenn es sie für dieses Eingabebild schon gibt
+    mask_height: Teil des Cache-Schlüssels (None = volle Auflösung)
+    """
+    source_hash = None
+    if mask_cache is not None and image_file is not None:
+        source_hash = file_hash(image_file)
+        mask = mask_cache.get(source_hash, model_id(_model_name), mask_height)
+        if mask is not None:
+            return mask
+
+    from rembg import remove
+    mask = remove(image, session=get_session(), only_mask=True).convert('L')
+    if source_hash is not None:
+        mask_cache.put(source_hash, model_id(_model_name), mask_height, mask)
+    return mask
+
+
+def _predict_batch(session, images):
+    """
+    Ein ONNX-Aufruf für alle Bilder, Nachbearbeitung pro Bild wie in rembg (U2netSession.predict)
+    """
+    import numpy as np
+
+    inputs = [session.normalize(image, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320))
+              for image in images]
+    name = next(iter(inputs[0]))
+    batch = {name: np.concatenate([item[name] for item in inputs])}
+    predictions = session.inner_session.run(None, batch)[0][:, 0, :, :]
+
+    masks = []
+    for image, pred in zip(images, predictions):
+        # Min/Max pro Bild, damit das Ergebnis nicht von den anderen Bildern im Stapel abhängt
+        pred = (pred - pred.min()) / (pred.max() - pred.min())
+        mask = Image.fromarray((pred * 255).astype('uint8'), mode='L')
+        masks.append(mask.resize(image.size, Image.Resampling.LANCZOS))
+    return masks
+
+
+def segment_masks(images):
+    """
+    Masken für mehrere Bilder, bei u2net-Modellen in einem gemeinsamen Modellaufruf
+    Modelle mit fester Batchgröße oder anderer Vorverarbeitung laufen einzeln über rembg
+    """
+    global _batch_supported
+    session = get_session()
+    if len(images) > 1 and _batch_supported and type(session).__name__ in _U2NET_SESSIONS:
+        try:
+            return _predict_batch(session, images)
+        except Exception as e:
+            # z.B. ONNX-Modell mit Batchgröße 1, ab jetzt einzeln
+            logger.debug("Stapelverarbeitung nicht möglich (%s), verarbeite einzeln", e)
+            _batch_supported = False
+
+    from rembg import remove
+    return [remove(image, session=session, only_mask=True).convert('L') for image in images]
+
+
+def cutout_working_resolution(image_file, target_height, mask_height=DEFAULT_MASK_HEIGHT, timer=None, mask_cache=None, segment=None):
+    """
+    Maske auf reduzierter Auflösung berechnen und nur den 8-Bit-Alphakanal hochskalieren
+    Die Maske entsteht immer in mask_height (unabhängig von target_height), damit sie
+    für jede Zielhöhe aus dem Cache wiederverwendet werden kann
+    image_file: Pfad oder Dateiobjekt (z.B. ein Upload im Speicher)
+    timer: StageTimer für die Stufen decode, segment, matting, resize und upscale
+    segment: eigene Maskenfunktion (Bild → Maske) statt segment_mask, z.B. ein Stapel-Sammler
+    Mit Matting (init_worker) wird die verfeinerte Maske gecacht, ein Treffer spart Modell und Matting
+    """
+    timer = timer or StageTimer()
+    with timer.stage('decode'):
+        base = open_reduced(image_file, max(target_height, mask_height))
+
+    # Verfeinerte Maske: (Eingabe-Hash, Cache-Name), nur für Dateien mit MaskCache
+    matte, mask = None, None
+    if _matting is not None and mask_cache is not None and isinstance(image_file, (str, Path)):
+        from matting import matting_key
+
+        matte = (file_hash(image_file), matting_key(model_id(_model_name), _matting))
+        mask = mask_cache.get(*matte, mask_height)
+    refined = mask is not None
+
+    if not refined:
+        with timer.stage('segment'):
+            work = base
+            if base.height > mask_height:
+                work = base.resize((int(base.width * mask_height / base.height), mask_height),
+                                   Image.Resampling.BILINEAR)
+            if segment is not None:
+                mask = segment(work)
+            else:
+                mask = segment_mask(work, image_file, mask_height, mask_cache)
+
+    if _matting is not None and not refined:
+        from matting import refine_mask
+
+        with timer.stage('matting'):
+            mask = refine_mask(work, mask, _matting)
+        if matte is not None:
+            mask_cache.put(*matte, mask_height, mask)
+
+    with timer.stage('resize'):
+        rgb = base
+        if base.height > target_height:
+            rgb = base.resize((int(base.width * target_height / base.height), target_height),
+                              Image.Resampling.LANCZOS)
+
+    with timer.stage('upscale'):
+        if mask.size != rgb.size:
+            mask = mask.resize(rgb.size, Image.Resampling.BILINEAR)
+        rgb.putalpha(mask)
+    return rgb
+
+
+def cutout_image(image_file, target_height=None, mask_height=DEFAULT_MASK_HEIGHT, timer=None, mask_cache=None,
+                 segment=None):
+    """
+    Freisteller als RGBA-Bild im Speicher (volles Bild, nicht zugeschnitten)
+    target_height: wenn gesetzt, wird auf Arbeitsauflösung segmentiert (siehe cutout_working_resolution)
+    mask_cache: MaskCache, bereits berechnete Masken werden wiederverwendet
+    segment: eigene Maskenfunktion (Bild → Maske) statt segment_mask, z.B. für Benchmarks ohne Modell
+    """
+    if target_height:
+        return cutout_working_resolution(image_file, target_height, mask_height, timer, mask_cache, segment)
+    timer = timer or StageTimer()
+    with timer.stage('decode'), Image.open(image_file) as img:
+        rgb = ImageOps.exif_transpose(img.convert('RGB'))
+    with timer.stage('segment'):
+        rgb.putalpha(segment(rgb) if segment is not None else segment_mask(rgb, image_file, None, mask_cache))
+    return rgb
+
+
+def cutout_file(image_file, output_folder, target_height=None, mask_height=DEFAULT_MASK_HEIGHT, timer=None, mask_cache=None):
+    """
+    Entfernt den Hintergrund eines einzelnen Bildes mit der warmen Session
+    Speichert den Freisteller auf die sichtbare Fläche zugeschnitten (mit Versatz, siehe cutout_store)
+    Gibt den Pfad der erzeugten *_cutout.png zurück
+    """
+    image_file = Path(image_file)
+    timer = timer or StageTimer()
+
+    # Ausgabedatei (immer als PNG für Transparenz)
+    output_file = Path(output_folder) / f"{image_file.stem}_cutout.png"
+
+    player = cutout_image(image_file, target_height, mask_height, timer, mask_cache)
+    with timer.stage('encode'):
+        save_cutout(player, output_file)
+    return output_file
+
+
+def _timed_cutout_file(image_file, output_folder, target_height, mask_height, mask_cache):
+    """
+    cutout_file für den Prozess-Pool, liefert (output_file, Stufen-Dauern in ms)
+    """
+    timer = StageTimer()
+    return cutout_file(image_file, output_folder, target_height, mask_height, timer, mask_cache), timer.stages
+
+
+def run_cutouts(image_files, output_folder, workers=1, threads=None, model_name=DEFAULT_MODEL,
+                target_height=None, mask_height=DEFAULT_MASK_HEIGHT, mask_cache=None, inter_op_threads=None,
+                matting=None):
+    """
+    Verarbeitet alle image_files und liefert (image_file, output_file, error, stages)
+    in der Reihenfolge der Fertigstellung, stages sind die Stufen-Dauern in ms
+    workers=1 verarbeitet im aktuellen Prozess, sonst über einen Prozess-Pool
+    target_height: Freisteller direkt in dieser Höhe erzeugen (Maske auf Arbeitsauflösung)
+    mask_cache: MaskCache, Bilder mit gespeicherter Maske brauchen das Modell nicht
+    matting: MattingParams, verfeinert die Kanten der Maske (nur mit target_height)
+    """
+    workers, threads = resolve_workers(workers, threads)
+
+    if workers == 1 or len(image_files) <= 1:
+        init_worker(model_name, threads, inter_op_threads, matting)
+        for image_file in image_files:
+            timer = StageTimer()
+            try:
+                yield image_file, cutout_file(image_file, output_folder, target_height, mask_height, timer, mask_cache), None, timer.stages
+            except Exception as e:
+                yield image_file, None, e, timer.stages
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(image_files)),
+                             initializer=init_worker,
+                             initargs=(model_name, threads, inter_op_threads, matting)) as executor:
+        futures = {executor.submit(_timed_cutout_file, image_file, output_folder, target_height, mask_height, mask_cache): image_file
+                   for image_file in image_files}
+        for future in as_completed(futures):
+            image_file = futures[future]
+            try:
+                output_file, stages = future.result()
+                yield image_file, output_file, None, stages
+            except Exception as e:
+                yield image_file, None, e, {}
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Kompakte Ablage der Freisteller
+- Freisteller werden auf die Bounding-Box des Alphakanals zugeschnitten,
+  Originalgröße und Versatz stehen als PNG-Textchunks in der Datei
+- Masken liegen als 8-Bit-PNG in einem eigenen Cache, Schlüssel ist der Hash des Eingabebilds,
+  damit neue Layouts, Hintergründe oder Zuschnitte nie das Modell neu starten
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+MASK_CACHE_DIR = '.mask_cache'
+
+# Namen der PNG-Textchunks
+FRAME_KEY = 'cutout_frame'
+OFFSET_KEY = 'cutout_offset'
+
+
+def crop_to_alpha(player):
+    """
+    Schneidet einen RGBA-Freisteller auf den sichtbaren Bereich zu
+    Gibt (zugeschnittenes Bild, (x, y)-Versatz, Originalgröße) zurück
+    """
+    frame_size = player.size
+    # getbbox() wertet bei RGBA nur den Alphakanal aus
+    bbox = player.getbbox()
+    if bbox is None:
+        # Komplett transparent: ein Pixel behalten, damit das Bild gültig bleibt
+        bbox = (0, 0, 1, 1)
+    if bbox == (0, 0) + frame_size:
+        return player, (0, 0), frame_size
+    return player.crop(bbox), bbox[:2], frame_size
+
+
+def save_cutout(player, output_file, offset=None, frame_size=None):
+    """
+    Speichert einen Freisteller zugeschnitten als PNG mit Versatz und Originalgröße
+    Ohne offset wird player als volles Bild betrachtet und hier zugeschnitten
+    """
+    if offset is None:
+        player, offset, frame_size = crop_to_alpha(player)
+    info = PngInfo()
+    info.add_text(FRAME_KEY, f"{frame_size[0]},{frame_size[1]}")
+    info.add_text(OFFSET_KEY, f"{offset[0]},{offset[1]}")
+    player.save(output_file, 'PNG', pnginfo=info)
+    return output_file
+
+
+def _parse_pair(value):
+    x, y = value.split(',')
+    return int(x), int(y)
+
+
+def load_cutout(cutout_file):
+    """
+    Lädt einen Freisteller als RGBA, liefert (Bild, Versatz, Originalgröße)
+    Ältere Freisteller ohne Textchunks gelten als volles Bild ohne Versatz
+    """
+    with Image.open(cutout_file) as img:
+        text = getattr(img, 'text', {})
+        player = img.convert('RGBA')
+    try:
+        return player, _parse_pair(text[OFFSET_KEY]), _parse_pair(text[FRAME_KEY])
+    except (KeyError, ValueError):
+        return player, (0, 0), player.size
+
+
+class MaskCache:
+    """
+    8-Bit-Masken pro (Eingabe-Hash, Modell, Maskenhöhe) als PNG in einem Ordner
+    enabled=False (--force): vorhandene Masken ignorieren, neu berechnete trotzdem speichern
+    """
+
+    def __init__(self, folder=MASK_CACHE_DIR, enabled=True):
+        self.folder = Path(folder)
+        self.enabled = enabled
+
+    def path(self, source_hash, model_name, mask_height):
+        return self.folder / f"{source_hash[:32]}_{model_name}_{mask_height or 'full'}.png"
+
+    def get(self, source_hash, model_name, mask_height):
+        """
+        Gespeicherte Maske oder None
+        """
+        if not self.enabled:
+            return None
+        path = self.path(source_hash, model_name, mask_height)
+        try:
+            with Image.open(path) as img:
+                return img.convert('L')
+        except (OSError, ValueError):
+            return None
+
+    def put(self, source_hash, model_name, mask_height, mask):
+        """
+        Maske atomar speichern (parallele Worker und Threads können dieselbe Datei schreiben,
+        daher eine eigene temporäre Datei pro Aufruf)
+        """
+        self.folder.mkdir(parents=True, exist_ok=True)
+        path = self.path(source_hash, model_name, mask_height)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.stem}.", suffix='.tmp',
+                                         delete=False) as tmp:
+            tmp_file = Path(tmp.name)
+            try:
+                mask.save(tmp, 'PNG')
+            except BaseException:
+                tmp.close()
+                tmp_file.unlink(missing_ok=True)
+                raise
+        os.replace(tmp_file, path)
+
+    def prune(self, source_hashes):
+        """
+        Entfernt Masken von Bildern, die es nicht mehr gibt, gibt die gelöschten Pfade zurück
+        """
+        if not self.folder.exists():
+            return []
+        keep = {source_hash[:32] for source_hash in source_hashes}
+        removed = []
+        for path in self.folder.glob('*.png'):
+            if path.name.split('_', 1)[0] not in keep:
+                path.unlink()
+                removed.append(path)
+        return removed
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Kodieren mit Ziel statt fester Qualität
+Pro Bild und Format wird die Qualität im Speicher per Binärsuche bestimmt:
+so niedrig wie möglich, solange die SSIM zum Original das Ziel erreicht,
+und höchstens so hoch, dass die Datei ins Byte-Budget passt
+"""
+
+import io
+from collections import namedtuple
+
+from PIL import Image
+
+# Suchbereich der Qualität pro Pillow-Format
+QUALITY_RANGE = {'JPEG': (40, 95), 'WEBP': (40, 95), 'AVIF': (30, 90)}
+
+# Konstanten der SSIM für 8-Bit-Bilder, Fenster 8x8 wie bei den üblichen Implementierungen
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+SSIM_WINDOW = 8
+
+EncodeTarget = namedtuple('EncodeTarget', ['max_bytes', 'min_ssim'])
+
+
+def parse_bytes(value):
+    """
+    '150k' → 153600, '1.5m' → 1572864, '80000' → 80000
+    """
+    value = value.strip().lower()
+    factor = {'k': 1024, 'm': 1024 * 1024}.get(value[-1:], 1)
+    number = value[:-1] if factor > 1 else value
+    return int(float(number) * factor)
+
+
+def describe(target):
+    """
+    Kurzform des Ziels für Manifest und Cache-Schlüssel, None = feste Qualität
+    """
+    if target is None or (target.max_bytes is None and target.min_ssim is None):
+        return None
+    parts = []
+    if target.min_ssim is not None:
+        parts.append(f"ssim>={target.min_ssim}")
+    if target.max_bytes is not None:
+        parts.append(f"bytes<={target.max_bytes}")
+    return ','.join(parts)
+
+
+def encode(image, pil_format, options, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **dict(options, quality=quality))
+    return buffer.getvalue()
+
+
+def ssim(reference, data):
+    """
+    Mittlere SSIM der Helligkeit zwischen reference und dem kodierten Bild data
+    Fenster als Boxfilter über ein Summenbild (ohne SciPy)
+    """
+    import numpy as np
+
+    with Image.open(io.BytesIO(data)) as img:
+        decoded = np.asarray(img.convert('L'), dtype=np.float64)
+    original = np.asarray(reference.convert('L'), dtype=np.float64)
+
+    def box_mean(values):
+        summed = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+        w = SSIM_WINDOW
+        return (summed[w:, w:] - summed[:-w, w:] - summed[w:, :-w] + summed[:-w, :-w]) / (w * w)
+
+    mu_x, mu_y = box_mean(original), box_mean(decoded)
+    var_x = box_mean(original * original) - mu_x * mu_x
+    var_y = box_mean(decoded * decoded) - mu_y * mu_y
+    cov = box_mean(original * decoded) - mu_x * mu_y
+    ssim_map = ((2 * mu_x * mu_y + _C1) * (2 * cov + _C2)) / \
+               ((mu_x * mu_x + mu_y * mu_y + _C1) * (var_x + var_y + _C2))
+    return float(ssim_map.mean())
+
+
+def search_quality(image, pil_format, options, target):
+    """
+    Binärsuche der Qualität, gibt (Daten, {'quality', 'bytes', 'ssim'}) zurück
+    min_ssim: niedrigste Qualität, die das Ziel erreicht (sonst die höchste)
+    max_bytes: höchste Qualität bis dahin, die ins Budget passt (sonst die niedrigste)
+    """
+    low, high = QUALITY_RANGE.get(pil_format, (40, 95))
+    encoded = {}
+
+    def result(quality):
+        if quality not in encoded:
+            encoded[quality] = encode(image, pil_format, options, quality)
+        return encoded[quality]
+
+    if target.min_ssim is not None:
+        # Kleinste Qualität mit SSIM >= Ziel
+        lo, hi = low, high
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ssim(image, result(mid)) >= target.min_ssim:
+                hi = mid
+            else:
+                lo = mid + 1
+        high = lo
+
+    if target.max_bytes is not None and len(result(high)) > target.max_bytes:
+        # Größte Qualität, die ins Budget passt
+        lo, hi = low, high
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if len(result(mid)) <= target.max_bytes:
+                lo = mid
+            else:
+                hi = mid - 1
+        high = lo
+
+    data = result(high)
+    info = {'quality': high, 'bytes': len(data)}
+    if target.min_ssim is not None:
+        info['ssim'] = round(ssim(image, data), 5)
+    return data, info
+
+
+def encode_to_target(image, pil_format, options, target=None, quality=None):
+    """
+    Kodiert image mit fester Qualität (quality, z.B. aus dem Manifest) oder sucht sie für target
+    Ohne beides gilt die Qualität aus options
+    """
+    if quality is None and describe(target) is not None:
+        return search_quality(image, pil_format, options, target)
+    if quality is None:
+        quality = options['quality']
+    data = encode(image, pil_format, options, quality)
+    return data, {'quality': quality, 'bytes': len(data)}
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Logging, Messwerte und Profiling für die Pipeline
+- setup_logging: leveled Logging statt print (--quiet / --verbose)
+- StageTimer: Dauer der einzelnen Stufen eines Bildes
+- MetricsWriter: ein JSON-Datensatz pro Bild (--metrics out.jsonl)
+- profiled: cProfile + tracemalloc um einen ganzen Lauf (--profile)
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(quiet=False, verbose=False):
+    """
+    Ausgabe auf stdout wie bisher, --quiet zeigt nur Warnungen und Fehler,
+    --verbose zusätzlich die Debug-Ausgaben pro Bild
+    """
+    level = logging.WARNING if quiet else logging.DEBUG if verbose else logging.INFO
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    # Pillow meldet auf DEBUG jeden PNG-Chunk
+    logging.getLogger('PIL').setLevel(max(level, logging.INFO))
+
+
+class StageTimer:
+    """
+    Sammelt die Dauer benannter Stufen in Millisekunden (gleiche Namen werden addiert)
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+
+def _file_size(path):
+    try:
+        return Path(path).stat().st_size
+    except (OSError, TypeError):
+        return None
+
+
+class MetricsWriter:
+    """
+    Schreibt pro Bild einen JSON-Datensatz (JSON Lines), threadsicher
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Zeilenweise gepuffert, damit --watch/--serve die Datei laufend füllen
+        self.file = open(self.path, 'w', encoding='utf-8', buffering=1)
+        self.lock = threading.Lock()
+
+    def record(self, step, image_file, status='ok', stages=None, output_file=None, error=None,
+               input_bytes=None, **extra):
+        """
+        step: Durchlauf ('cutout', 'combine', 'stream'), status: 'ok', 'skipped' oder 'error'
+        input_bytes: Größe der Eingabe, wenn image_file keine lokale Datei ist (z.B. Upload im Service)
+        """
+        stages = {name: round(ms, 3) for name, ms in (stages or {}).items()}
+        record = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'step': step,
+            'image': Path(image_file).name,
+            'status': status,
+            'stages_ms': stages,
+            'total_ms': round(sum(stages.values()), 3),
+            'input_bytes': input_bytes if input_bytes is not None else _file_size(image_file),
+            'output_bytes': _file_size(output_file) if output_file else None,
+        }
+        if error is not None:
+            record['error'] = f"{type(error).__name__}: {error}"
+        record.update(extra)
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+@contextmanager
+def profiled(prefix='profile', top=30):
+    """
+    Misst den Block mit cProfile und tracemalloc und schreibt
+    <prefix>.prof (für snakeviz/pstats) und <prefix>.txt (Zusammenfassung)
+    cProfile erfasst nur den Hauptthread, tracemalloc nur Python-Allokationen
+    (NumPy ja, Pixelpuffer von Pillow nein)
+    """
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        prof_file = Path(f"{prefix}.prof")
+        summary_file = Path(f"{prefix}.txt")
+        profiler.dump_stats(prof_file)
+
+        out = io.StringIO()
+        out.write(f"Laufzeit: {elapsed:.2f} s, Python-Speicher-Peak: {peak / 1024 / 1024:.1f} MB\n")
+        for sort in ('cumulative', 'tottime'):
+            out.write(f"\n=== Top {top} nach {sort} ===\n")
+            pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(top)
+        out.write(f"\n=== Top {top} Allokationen (noch belegt) ===\n")
+        for stat in snapshot.statistics('lineno')[:top]:
+            out.write(f"{stat}\n")
+        summary_file.write_text(out.getvalue(), encoding='utf-8')
+        logger.info("📊 Profil: %s, Zusammenfassung: %s", prof_file, summary_file)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Paralleles Kombinieren über mehrere Prozesse (--compose-workers)
+Die dekodierte Hintergrund-Vorlage liegt einmal in multiprocessing.shared_memory,
+kein Worker bekommt eine eigene Kopie über Pickle. Jeder Worker hält einen eigenen
+Bildpuffer, kopiert die Vorlage pro Spieler hinein und zeichnet direkt darauf
+(skalieren, einfügen, Text, JPEG). Die Worker bekommen zusammenhängende Bereiche
+der Freisteller, die Ergebnisse kommen bereichsweise zurück
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from PIL import Image
+
+from cutout_store import load_cutout
+from instrumentation import StageTimer
+
+# Bereiche pro Worker: klein genug zum Ausgleichen, groß genug für wenig Verwaltungsaufwand
+RANGES_PER_WORKER = 4
+
+# Zustand pro Worker-Prozess (siehe init_compose_worker)
+_shared = None
+_canvas = None
+_nbytes = 0
+_options = {}
+
+
+class SharedTemplate:
+    """
+    Hintergrund-Vorlage als Rohdaten in einem Shared-Memory-Block
+    Wird vom Hauptprozess angelegt und nach dem Lauf wieder freigegeben (close)
+    """
+
+    def __init__(self, template):
+        data = template.tobytes()
+        self.mode = template.mode
+        self.size = template.size
+        self.nbytes = len(data)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.nbytes)
+        self.shm.buf[:self.nbytes] = data
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name):
+    try:
+        # Python 3.13+: der Worker soll den Block beim Beenden nicht freigeben
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def init_compose_worker(name, mode, size, nbytes, options):
+    """
+    Initializer für den Prozess-Pool: Vorlage einbinden und den eigenen Puffer anlegen
+    options: Argumente für compose_player (Position, Text, Schrift, max_height)
+    """
+    global _shared, _canvas, _nbytes, _options
+    _shared = _attach(name)
+    _canvas = Image.new(mode, size)
+    _nbytes = nbytes
+    _options = options
+
+
+def compose_range(jobs):
+    """
+    Kombiniert einen Bereich von (Freisteller, Ausgabedatei) im eigenen Puffer
+    Liefert pro Spieler (Freisteller, Ausgabedatei, Fehler, Stufen-Dauern in ms)
+    """
+    # Erst im Worker importieren, core importiert dieses Modul
+    from core import compose_player
+
+    results = []
+    for cutout_file, output_file in jobs:
+        timer = StageTimer()
+        try:
+            with timer.stage('decode'):
+                player, offset, frame_size = load_cutout(cutout_file)
+            with timer.stage('paste'):
+                # Vorlage aus dem Shared Memory in den eigenen Puffer kopieren (keine neue Allokation)
+                _canvas.frombytes(_shared.buf[:_nbytes])
+            background = compose_player(_canvas, player, cutout_file.name, timer=timer, offset=offset,
+                                        frame_size=frame_size, in_place=True, **_options)
+            with timer.stage('encode'):
+                background.save(output_file, 'JPEG', quality=95)
+            results.append((cutout_file, output_file, None, timer.stages))
+        except Exception as e:
+            results.append((cutout_file, output_file, e, timer.stages))
+    return results
+
+
+def split_ranges(jobs, workers, per_worker=RANGES_PER_WORKER):
+    """
+    Teilt jobs in zusammenhängende, etwa gleich große Bereiche
+    """
+    size = max(1, math.ceil(len(jobs) / (workers * per_worker)))
+    return [jobs[start:start + size] for start in range(0, len(jobs), size)]
+
+
+def run_compose(jobs, template, workers, options):
+    """
+    Kombiniert jobs [(Freisteller, Ausgabedatei), ...] mit workers Prozessen
+    Liefert (Freisteller, Ausgabedatei, Fehler, Stufen) in der Reihenfolge der Fertigstellung
+    template: dekodierte RGB-Vorlage, options: Argumente für compose_player
+    """
+    if not jobs:
+        return
+    workers = min(workers, len(jobs))
+    with SharedTemplate(template) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_compose_worker,
+                                 initargs=(shared.name, shared.mode, shared.size, shared.nbytes,
+                                           options)) as executor:
+            futures = {executor.submit(compose_range, jobs_range): jobs_range
+                       for jobs_range in split_ranges(jobs, workers)}
+            for future in as_completed(futures):
+                try:
+                    yield from future.result()
+                except Exception as e:
+                    # Worker abgestürzt: alle Spieler dieses Bereichs als Fehler melden
+                    for cutout_file, output_file in futures[future]:
+                        yield cutout_file, output_file, e, {}
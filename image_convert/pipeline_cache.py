@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Inkrementeller Build-Cache für die Bild-Pipeline
+Merkt sich pro Quelldatei den Inhalts-Hash und die relevanten Einstellungen,
+damit unveränderte Bilder beim nächsten Lauf übersprungen werden
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_FILE = '.pipeline_cache.json'
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    SHA-256 des Dateiinhalts (blockweise gelesen)
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_key(source_hash, **settings):
+    """
+    Schlüssel aus Quell-Hash und allen Einstellungen, die das Ergebnis beeinflussen
+    """
+    payload = json.dumps({'source': source_hash, 'settings': settings},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PipelineCache:
+    """
+    Manifest der Form {stage: {quelle: {'key': ..., 'output': ...}}}
+    """
+
+    def __init__(self, path=CACHE_FILE, enabled=True):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                # Defektes Manifest → alles neu bauen
+                self.entries = {}
+
+    def _stage(self, stage):
+        return self.entries.setdefault(stage, {})
+
+    def is_fresh(self, stage, source, key):
+        """
+        True, wenn die Ausgabe zu diesem Schlüssel schon existiert
+        """
+        if not self.enabled:
+            return False
+        entry = self._stage(stage).get(str(source))
+        if not entry or entry.get('key') != key:
+            return False
+        return all(Path(output).exists() for output in entry.get('outputs', []))
+
+    def get(self, stage, source):
+        return self._stage(stage).get(str(source))
+
+    def record(self, stage, source, key, outputs, **extra):
+        entry = {'key': key, 'outputs': [str(output) for output in outputs]}
+        entry.update(extra)
+        self._stage(stage)[str(source)] = entry
+
+    def prune(self, stage):
+        """
+        Entfernt Ausgaben, deren Quelldatei nicht mehr existiert
+        Gibt die Liste der gelöschten Dateien zurück
+        """
+        removed = []
+        entries = self._stage(stage)
+        for source in list(entries):
+            if Path(source).exists():
+                continue
+            for output in entries[source].get('outputs', []):
+                output_path = Path(output)
+                if output_path.exists():
+                    output_path.unlink()
+                    removed.append(output_path)
+            del entries[source]
+        return removed
+
+    def save(self):
+        """
+        Schreibt das Manifest atomar (erst temporäre Datei, dann umbenennen)
+        """
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Lokaler HTTP-Dienst für Freisteller und fertige Spielerbilder (--serve)
+- POST /api/cutout  Foto → zugeschnittener Freisteller (PNG mit Versatz, siehe cutout_store)
+- POST /api/card    Foto → fertiges Bild auf dem Hintergrund (JPEG)
+- GET  /metrics     Latenzen, Stapelgrößen und laufende Anfragen (JSON)
+- GET  /health
+Fotos kommen als Rohdaten (Content-Type image/*) oder als multipart/form-data,
+Optionen (name, number, position, text, background, height) als Query- oder Formularfelder.
+Das Modell bleibt geladen, gleichzeitige Anfragen werden zu einem Modellaufruf gebündelt,
+Antworten werden schon während des Kodierens gesendet (chunked)
+"""
+
+import hashlib
+import io
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import UnidentifiedImageError
+
+from compositor import load_background_template
+from cutout_engine import (DEFAULT_MASK_HEIGHT, DEFAULT_MODEL, cutout_working_resolution, get_session, model_id,
+                           segment_masks)
+from cutout_store import crop_to_alpha, save_cutout
+from instrumentation import StageTimer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+MAX_UPLOAD = 50 * 1024 * 1024
+MAX_HEIGHT = 4000
+
+# Letzte Werte pro Messreihe für die Perzentile
+LATENCY_WINDOW = 1000
+
+
+class ServiceError(Exception):
+    """
+    Fehler mit HTTP-Status, wird als {"error": ...} beantwortet (wie die API von apiform.js)
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyStats:
+    """
+    Latenzen (ms) pro Messreihe, Stapelgrößen und Statuscodes, threadsicher
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.batches = {}
+        self.statuses = {}
+
+    def add(self, name, ms):
+        with self.lock:
+            self.latencies.setdefault(name, deque(maxlen=LATENCY_WINDOW)).append(ms)
+
+    def add_stages(self, prefix, stages):
+        for name, ms in stages.items():
+            self.add(f"{prefix}.{name}", ms)
+
+    def batch(self, size):
+        with self.lock:
+            self.batches[size] = self.batches.get(size, 0) + 1
+
+    def status(self, endpoint, code):
+        with self.lock:
+            key = f"{endpoint} {code}"
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def summary(self):
+        with self.lock:
+            latencies = {name: sorted(values) for name, values in self.latencies.items()}
+            batches = dict(self.batches)
+            statuses = dict(self.statuses)
+        result = {}
+        for name, values in sorted(latencies.items()):
+            result[name] = {
+                'count': len(values),
+                'mean': round(sum(values) / len(values), 2),
+                'p50': round(values[len(values) // 2], 2),
+                'p95': round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+                'max': round(values[-1], 2),
+            }
+        return {'latency_ms': result, 'batch_sizes': batches, 'responses': statuses}
+
+
+class MaskBatcher:
+    """
+    Ein Thread besitzt das Modell und sammelt Anfragen: nach der ersten wird höchstens
+    max_wait Sekunden auf weitere gewartet, dann laufen bis zu max_batch Bilder gemeinsam
+    """
+
+    def __init__(self, max_batch=4, max_wait=0.01, stats=None):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.stats = stats
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='mask-batcher', daemon=True)
+        self.thread.start()
+
+    def mask(self, image):
+        """
+        Maske für image, blockiert bis der Stapel berechnet ist
+        """
+        future = Future()
+        self.queue.put((image, future))
+        return future.result()
+
+    def pending(self):
+        return self.queue.qsize()
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            try:
+                masks = segment_masks([image for image, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            if self.stats is not None:
+                self.stats.add('model.batch', (time.perf_counter() - start) * 1000)
+                self.stats.batch(len(batch))
+            for (_, future), mask in zip(batch, masks):
+                future.set_result(mask)
+
+
+class ChunkedWriter:
+    """
+    Dateiobjekt für Image.save, schickt jeden Block sofort als HTTP-Chunk
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.bytes = 0
+
+    def write(self, data):
+        if data:
+            self.wfile.write(b'%X\r\n' % len(data) + bytes(data) + b'\r\n')
+            self.bytes += len(data)
+        return len(data)
+
+    def flush(self):
+        self.wfile.flush()
+
+    def close(self):
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+
+def parse_upload(content_type, body, fields):
+    """
+    Liefert (Bilddaten, Dateiname, Felder) aus einem Rohdaten- oder multipart-Upload
+    """
+    if not content_type.startswith('multipart/form-data'):
+        return body, fields.get('filename'), fields
+    header = f"Content-Type: {content_type}\r\n\r\n".encode('latin-1')
+    message = BytesParser(policy=policy.HTTP).parsebytes(header + body)
+    data, filename = None, None
+    for part in message.iter_parts():
+        if part.get_filename():
+            data, filename = part.get_payload(decode=True), part.get_filename()
+        else:
+            name = part.get_param('name', header='content-disposition')
+            if name:
+                fields[name] = part.get_payload(decode=True).decode('utf-8', 'replace')
+    return data, fields.get('filename', filename), fields
+
+
+class CutoutService:
+    """
+    Verarbeitet Uploads mit der warmen Session, begrenzt gleichzeitige Anfragen
+    settings: Voreinstellungen der Kommandozeile (Position, Text, Schrift, Höhe)
+    """
+
+    def __init__(self, bg_folder='backgrounds', mask_cache=None, max_batch=4, max_wait=0.01,
+                 max_inflight=8, mask_height=DEFAULT_MASK_HEIGHT, model_name=DEFAULT_MODEL,
+                 metrics=None, **settings):
+        self.bg_folder = Path(bg_folder)
+        self.mask_cache = mask_cache
+        self.mask_height = mask_height
+        self.model_name = model_name
+        self.metrics = metrics
+        self.settings = settings
+        self.stats = LatencyStats()
+        self.batcher = MaskBatcher(max_batch, max_wait, self.stats)
+        self.max_inflight = max_inflight
+        self.slots = threading.BoundedSemaphore(max_inflight)
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.templates = {}
+
+    def template(self, name=None):
+        """
+        Dekodierte Hintergrund-Vorlage (Dateiname ohne Endung), Standard ist der erste Hintergrund
+        """
+        # core importiert diesen Modul erst bei --serve, daher hier und nicht oben
+        from core import find_backgrounds
+
+        bg_files = {bg_file.stem: bg_file for bg_file in find_backgrounds(self.bg_folder)}
+        if not bg_files:
+            raise ServiceError(500, f"Keine Hintergrundbilder in {self.bg_folder}")
+        name = name or next(iter(bg_files))
+        if name not in bg_files:
+            raise ServiceError(404, f"Hintergrund '{name}' nicht gefunden (verfügbar: {', '.join(bg_files)})")
+        bg_file = bg_files[name]
+        mtime = bg_file.stat().st_mtime_ns
+        with self.lock:
+            cached = self.templates.get(name)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, load_background_template(bg_file))
+                self.templates[name] = cached
+        return cached[1]
+
+    def _segment(self, source_hash):
+        """
+        Maskenfunktion für cutout_working_resolution: erst MaskCache, dann der Stapel
+        """
+        def segment(work):
+            if self.mask_cache is not None:
+                mask = self.mask_cache.get(source_hash, model_id(self.model_name), self.mask_height)
+                if mask is not None:
+                    return mask
+            mask = self.batcher.mask(work)
+            if self.mask_cache is not None:
+                self.mask_cache.put(source_hash, model_id(self.model_name), self.mask_height, mask)
+            return mask
+        return segment
+
+    def cutout(self, data, height, timer):
+        """
+        Freisteller (volles Bild, RGBA) in der gewünschten Höhe
+        """
+        source_hash = hashlib.sha256(data).hexdigest()
+        try:
+            return cutout_working_resolution(io.BytesIO(data), height, self.mask_height, timer,
+                                             segment=self._segment(source_hash))
+        except (UnidentifiedImageError, OSError) as e:
+            raise ServiceError(400, f"Bild konnte nicht gelesen werden ({type(e).__name__})")
+
+    def card(self, data, fields, filename, timer):
+        """
+        Fertiges Bild wie im Batch-Lauf (compose_player), Name/Nummer aus Feldern oder Dateinamen
+        """
+        from core import compose_player, extract_player_info
+
+        position = fields.get('position', self.settings['position'])
+        if position not in ('center', 'bottom', 'top'):
+            raise ServiceError(400, f"Unbekannte Position '{position}'")
+        add_text = fields.get('text', '1' if self.settings['add_text'] else '0') not in ('0', 'false', 'no')
+        template = self.template(fields.get('background'))
+        max_height = self.settings['max_height']
+
+        player = self.cutout(data, max_height, timer)
+        # Felder ergänzen bzw. überschreiben, was im Dateinamen steht
+        name, number = extract_player_info(filename) if filename else ('', '')
+        player_info = (fields.get('name') or name, fields.get('number') or number)
+        return compose_player(template, player, filename or 'upload', position, add_text,
+                              self.settings['font_path'], self.settings['number_size'],
+                              self.settings['name_size'], max_height, timer, player_info=player_info)
+
+    def acquire(self):
+        if not self.slots.acquire(blocking=False):
+            raise ServiceError(503, 'Zu viele gleichzeitige Anfragen, bitte erneut versuchen')
+        with self.lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def snapshot(self):
+        summary = self.stats.summary()
+        with self.lock:
+            summary['in_flight'] = self.in_flight
+        summary['max_inflight'] = self.max_inflight
+        summary['queued_masks'] = self.batcher.pending()
+        return summary
+
+
+def make_handler(service, cors_origin='*'):
+    """
+    Request-Handler-Klasse für ThreadingHTTPServer, gebunden an service
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        server_version = 'image_convert'
+
+        def log_message(self, format, *args):
+            logger.debug("🌐 %s %s", self.address_string(), format % args)
+
+        def _send_headers(self, status, content_type, length=None):
+            self.streaming = length is None
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Access-Control-Allow-Origin', cors_origin)
+            if length is None:
+                self.send_header('Transfer-Encoding', 'chunked')
+            else:
+                self.send_header('Content-Length', str(length))
+            if status == 503:
+                self.send_header('Retry-After', '1')
+            if self.close_connection:
+                self.send_header('Connection', 'close')
+            self.end_headers()
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self._send_headers(status, 'application/json; charset=utf-8', len(body))
+            self.wfile.write(body)
+
+        def _send_image(self, image, image_format, content_type, **save_args):
+            self._send_headers(200, content_type)
+            writer = ChunkedWriter(self.wfile)
+            image.save(writer, image_format, **save_args)
+            writer.close()
+            return writer.bytes
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self.send_header('Access-Control-Allow-Origin', cors_origin)
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Filename')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            if path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            elif path == '/metrics':
+                self._send_json(200, service.snapshot())
+            else:
+                self._send_json(404, {'error': f"Unbekannter Pfad {path}"})
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            endpoint = url.path.rstrip('/')
+            if endpoint not in ('/api/cutout', '/api/card'):
+                # Der Body bleibt ungelesen und darf nicht als nächste Anfrage gelesen werden
+                self.close_connection = True
+                self._send_json(404, {'error': f"Unbekannter Pfad {url.path}"})
+                return
+
+            start = time.perf_counter()
+            timer = StageTimer()
+            status, filename, output_bytes, body, data = 200, None, None, b'', b''
+            acquired = body_read = False
+            self.streaming = False
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                if length <= 0:
+                    raise ServiceError(411, 'Content-Length fehlt')
+                if length > MAX_UPLOAD:
+                    raise ServiceError(413, f"Upload größer als {MAX_UPLOAD // 1024 // 1024} MB")
+                service.acquire()
+                acquired = True
+
+                with timer.stage('upload'):
+                    body = self.rfile.read(length)
+                body_read = True
+                fields = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                if self.headers.get('X-Filename'):
+                    fields.setdefault('filename', self.headers['X-Filename'])
+                data, filename, fields = parse_upload(self.headers.get('Content-Type', ''), body, fields)
+                if not data:
+                    raise ServiceError(400, 'Kein Bild im Upload')
+
+                if endpoint == '/api/cutout':
+                    height = min(int(fields.get('height') or service.settings['max_height']), MAX_HEIGHT)
+                    player, offset, frame_size = crop_to_alpha(service.cutout(data, height, timer))
+                    with timer.stage('encode'):
+                        self._send_headers(200, 'image/png')
+                        writer = ChunkedWriter(self.wfile)
+                        save_cutout(player, writer, offset, frame_size)
+                        writer.close()
+                        output_bytes = writer.bytes
+                else:
+                    card = service.card(data, fields, filename, timer)
+                    with timer.stage('encode'):
+                        output_bytes = self._send_image(card, 'JPEG', 'image/jpeg', quality=95)
+            except Exception as e:
+                status = e.status if isinstance(e, ServiceError) else 400 if isinstance(e, ValueError) else 500
+                if status == 500:
+                    logger.exception("  ✗ Fehler bei %s", endpoint)
+                if self.streaming:
+                    # Kopfzeilen sind schon unterwegs, nur noch die Verbindung abbrechen
+                    self.close_connection = True
+                else:
+                    if not body_read:
+                        # 411/413/503 kommen vor dem Body: Verbindung schließen statt ihn als
+                        # nächste Anfrage auf derselben Keep-alive-Verbindung zu lesen
+                        self.close_connection = True
+                    self._send_json(status, {'error': str(e) if status != 500 else f"{type(e).__name__}: {e}"})
+            finally:
+                if acquired:
+                    service.release()
+
+            total_ms = (time.perf_counter() - start) * 1000
+            name = endpoint.rsplit('/', 1)[-1]
+            service.stats.status(name, status)
+            if status == 200:
+                service.stats.add(f"{name}.total", total_ms)
+                service.stats.add_stages(name, timer.stages)
+            if service.metrics is not None:
+                service.metrics.record(f"serve-{name}", filename or 'upload',
+                                       'ok' if status == 200 else 'error', timer.stages,
+                                       input_bytes=len(data), http_status=status, upload_bytes=len(body),
+                                       response_bytes=output_bytes)
+            logger.info("  %s %s %s (%.0f ms)", '✓' if status == 200 else '✗', name, filename or '', total_ms)
+
+    return Handler
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT, threads=None, inter_op_threads=None):
+    """
+    Lädt das Modell und beantwortet Anfragen bis Strg+C
+    """
+    logger.info("🔥 Lade Modell %s...", service.model_name)
+    get_session(service.model_name, threads, inter_op_threads)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    logger.info("🌐 Dienst läuft auf http://%s:%s (POST /api/cutout, /api/card, GET /metrics)", host, server.server_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("\n👋 Dienst beendet")
+    finally:
+        server.server_close()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Streaming-Pipeline für Mannschaftsfotos
+Jedes Bild läuft im Speicher durch Freistellen → Kombinieren → JPEG-Kodierung,
+ohne Umweg über PNG-Zwischendateien. Die Stufen sind über begrenzte Queues
+verbunden und laufen in eigenen Threads (onnxruntime und Pillow geben den GIL frei)
+"""
+
+import queue
+import threading
+from pathlib import Path
+
+from cutout_engine import DEFAULT_MASK_HEIGHT, DEFAULT_MODEL, cutout_image, init_worker, resolve_workers
+from cutout_store import save_cutout
+from instrumentation import StageTimer
+
+# Markiert das Ende einer Queue
+_DONE = object()
+
+
+def _run_stage(func, inbox, outbox, results, workers):
+    """
+    Startet workers Threads, die (quelle, daten) aus inbox lesen und func(quelle, daten)
+    nach outbox schreiben. Fehler landen direkt in results.
+    Wenn alle Worker fertig sind, wird das Ende an outbox weitergegeben.
+    """
+    def worker():
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                # Auch die übrigen Worker dieser Stufe beenden
+                inbox.put(_DONE)
+                return
+            source, payload = item
+            try:
+                outbox.put((source, func(source, payload)))
+            except Exception as e:
+                results.put((source, None, e))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+
+    def close():
+        for thread in threads:
+            thread.join()
+        outbox.put(_DONE)
+
+    threading.Thread(target=close, daemon=True).start()
+
+
+def stream_pipeline(image_files, compose, output_folder, cutout_folder=None,
+                    model_name=DEFAULT_MODEL, threads=None, queue_size=4,
+                    compose_workers=1, encode_workers=1, quality=95,
+                    target_height=None, mask_height=DEFAULT_MASK_HEIGHT, mask_cache=None,
+                    inter_op_threads=None, matting=None):
+    """
+    Verarbeitet image_files als Stream und liefert (image_file, output_file, error, stages)
+    in der Reihenfolge der Fertigstellung, stages sind die Stufen-Dauern in ms
+    compose(player, image_file, timer) erzeugt aus dem RGBA-Spieler das finale RGB-Bild
+    cutout_folder: wenn gesetzt, werden die Freisteller zusätzlich als PNG gespeichert
+    target_height: Maske auf Arbeitsauflösung berechnen, Spieler direkt in dieser Höhe
+    mask_cache: MaskCache, Bilder mit gespeicherter Maske brauchen das Modell nicht
+    matting: MattingParams, Kanten der Maske verfeinern (nur mit target_height)
+    """
+    _, threads = resolve_workers(1, threads)
+    init_worker(model_name, threads, inter_op_threads, matting)
+    output_path = Path(output_folder)
+
+    pending = queue.Queue(maxsize=queue_size)
+    segmented = queue.Queue(maxsize=queue_size)
+    composed = queue.Queue(maxsize=queue_size)
+    finished = queue.Queue(maxsize=queue_size)
+    results = queue.Queue()
+
+    # Ein Timer pro Bild, jedes Bild ist immer nur in einer Stufe
+    timers = {Path(image_file): StageTimer() for image_file in image_files}
+
+    def segment(image_file, _):
+        return cutout_image(image_file, target_height, mask_height, timers[image_file], mask_cache)
+
+    def composite(image_file, player):
+        final = compose(player, image_file, timers[image_file])
+        return final, (player if cutout_folder else None)
+
+    def encode(image_file, payload):
+        final, player = payload
+        timer = timers[image_file]
+        if player is not None:
+            with timer.stage('encode_cutout'):
+                save_cutout(player, Path(cutout_folder) / f"{image_file.stem}_cutout.png")
+        output_file = output_path / f"{image_file.stem}_final.jpg"
+        with timer.stage('encode'):
+            final.save(output_file, 'JPEG', quality=quality)
+        return output_file
+
+    # Segmentierung nutzt die Threads von onnxruntime, daher nur ein Stufen-Thread
+    _run_stage(segment, pending, segmented, results, 1)
+    _run_stage(composite, segmented, composed, results, compose_workers)
+    _run_stage(encode, composed, finished, results, encode_workers)
+
+    def feed():
+        for image_file in image_files:
+            pending.put((Path(image_file), None))
+        pending.put(_DONE)
+
+    def collect():
+        while True:
+            item = finished.get()
+            if item is _DONE:
+                return
+            source, output_file = item
+            results.put((source, output_file, None))
+
+    threading.Thread(target=feed, daemon=True).start()
+    threading.Thread(target=collect, daemon=True).start()
+
+    # Jedes Bild liefert genau ein Ergebnis (Erfolg oder Fehler in einer Stufe)
+    for _ in range(len(image_files)):
+        source, output_file, error = results.get()
+        yield source, output_file, error, timers.pop(source).stages
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Mehrere Ausgabeziele in einem Durchlauf (z.B. Heim, Auswärts, Saison)
+Ein Ziel besteht aus Name, Hintergrund, Position und Text an/aus,
+jedes Ziel bekommt einen eigenen Unterordner in final_results/
+"""
+
+import argparse
+from collections import namedtuple
+from pathlib import Path
+
+POSITIONS = ('center', 'bottom', 'top')
+
+# Schalter für Text an/aus in der Kurzschreibweise
+TEXT_FLAGS = {'text': True, 'notext': False}
+
+Target = namedtuple('Target', ['name', 'background', 'position', 'add_text'])
+
+
+def parse_target(value):
+    """
+    'heim=backgrounds/heim.jpg:bottom:notext' → Target('heim', Path('backgrounds/heim.jpg'), 'bottom', False)
+    Position und text/notext sind optional (None = Einstellung der Kommandozeile)
+    """
+    name, sep, spec = value.partition('=')
+    if not sep or not name.strip() or not spec:
+        raise argparse.ArgumentTypeError(
+            f"Ziel '{value}' erwartet NAME=HINTERGRUND[:POSITION][:text|notext]")
+    background, *options = spec.split(':')
+    position, add_text = None, None
+    for option in options:
+        if option in POSITIONS:
+            position = option
+        elif option in TEXT_FLAGS:
+            add_text = TEXT_FLAGS[option]
+        else:
+            raise argparse.ArgumentTypeError(
+                f"Unbekannte Option '{option}' in Ziel '{value}' "
+                f"(erlaubt: {', '.join(POSITIONS + tuple(TEXT_FLAGS))})")
+    return Target(name.strip(), Path(background), position, add_text)
+
+
+def resolve_targets(targets, position='center', add_text=True):
+    """
+    Fehlende Position/Text-Angaben mit den Einstellungen der Kommandozeile füllen
+    ValueError bei doppelten Namen oder fehlenden Hintergründen
+    """
+    resolved = []
+    for target in targets:
+        if not target.background.is_file():
+            raise ValueError(f"Hintergrund für Ziel '{target.name}' nicht gefunden: {target.background}")
+        resolved.append(target._replace(
+            position=target.position or position,
+            add_text=add_text if target.add_text is None else target.add_text))
+    names = [target.name for target in resolved]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Zielnamen müssen eindeutig sein: {', '.join(duplicates)}")
+    return resolved
+
+
+def targets_for_backgrounds(bg_files, position=None, add_text=None):
+    """
+    Ein Ziel pro Hintergrundbild, benannt nach dem Dateinamen
+    """
+    return [Target(Path(bg_file).stem, Path(bg_file), position, add_text) for bg_file in bg_files]
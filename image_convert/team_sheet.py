@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Mannschaftsbild und Kontaktbogen aus den Freistellern
+Spieler werden nach Nummer sortiert in Reihen gesetzt. Jeder Freisteller wird einzeln
+geladen, verkleinert und direkt in die Ausgabe eingefügt, der Speicherbedarf bleibt
+bei etwa Ausgabebild + ein Spieler (auch bei 50+ Spielern in Druckauflösung)
+"""
+
+import math
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageOps
+
+from cutout_store import crop_to_alpha, load_cutout
+from text_renderer import get_font, resolve_font_path
+
+# Mannschaftsbild 20x13 Zoll bei 300 dpi, Kontaktbogen A4 bei 300 dpi
+TEAM_SIZE = (6000, 4000)
+SHEET_SIZE = (2480, 3508)
+SHEET_DPI = 300
+
+# Typisches Verhältnis Breite/Höhe eines zugeschnittenen Spielers
+PLAYER_ASPECT = 0.45
+
+TEAM_COLOR = (30, 30, 130)
+
+
+def number_key(entry):
+    """
+    Sortierschlüssel für (Nummer, Name, Datei): Nummern numerisch, ohne Nummer ans Ende
+    """
+    number, name, _ = entry
+    if number.isdigit():
+        return (0, int(number), name)
+    return (1, 0, name)
+
+
+def caption(number, name):
+    return name if number == '?' else f"#{number} {name}"
+
+
+def caption_font(font_path, text, max_width, size):
+    """
+    Größte Schrift bis size, in der text in max_width passt
+    """
+    font = get_font(font_path, size)
+    while size > 8 and font.getlength(text) > max_width:
+        size = int(size * 0.9)
+        font = get_font(font_path, size)
+    return font
+
+
+def best_columns(count, area_size, label_height=0, aspect=PLAYER_ASPECT):
+    """
+    Spaltenzahl, bei der die Spieler in area_size am größten werden
+    """
+    width, height = area_size
+    best_height, best = 0, 1
+    for columns in range(1, count + 1):
+        rows = math.ceil(count / columns)
+        player_height = min(height / rows - label_height, width / columns / aspect)
+        if player_height > best_height:
+            best_height, best = player_height, columns
+    return best
+
+
+def paste_fitted(canvas, cutout_file, box):
+    """
+    Lädt einen Freisteller, verkleinert ihn auf box (links, oben, Breite, Höhe)
+    und setzt ihn unten bündig und horizontal zentriert ein
+    """
+    left, top, width, height = box
+    # Ältere Freisteller im vollen Bildformat bringen sonst ihren transparenten Rand mit
+    player = crop_to_alpha(load_cutout(cutout_file)[0])[0]
+    player.thumbnail((max(1, width), max(1, height)), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    x = left + (width - player.width) // 2
+    y = top + height - player.height
+    canvas.paste(player, (x, y), player)
+
+
+def _cells(count, columns, origin, area_size):
+    """
+    Liefert (Index, links, oben, Zellbreite, Zellhöhe), die letzte Reihe wird zentriert
+    """
+    rows = math.ceil(count / columns)
+    cell_width = area_size[0] / columns
+    cell_height = area_size[1] / rows
+    for index in range(count):
+        row, column = divmod(index, columns)
+        in_row = min(columns, count - row * columns)
+        left = origin[0] + (columns - in_row) * cell_width / 2 + column * cell_width
+        top = origin[1] + row * cell_height
+        yield index, int(left), int(top), int(cell_width), int(cell_height)
+
+
+def render_team(entries, size=TEAM_SIZE, background=None, columns=None, margin=80, spacing=24,
+                labels=True, font_path=None):
+    """
+    Mannschaftsbild: alle Spieler in Reihen, nach Nummer sortiert
+    entries: Liste von (Nummer, Name, Freisteller-Datei)
+    background: RGB-Vorlage, wird auf size zugeschnitten (sonst einfarbig)
+    """
+    entries = sorted(entries, key=number_key)
+    if background is not None:
+        canvas = ImageOps.fit(background, size, Image.Resampling.LANCZOS)
+    else:
+        canvas = Image.new('RGB', size, TEAM_COLOR)
+    if not entries:
+        return canvas
+
+    label_height = size[1] // 45 if labels else 0
+    area = (size[0] - 2 * margin, size[1] - 2 * margin)
+    columns = columns or best_columns(len(entries), area, label_height + spacing)
+    font_path = resolve_font_path(font_path)
+    font_size = max(8, int(label_height * 0.8))
+    draw = ImageDraw.Draw(canvas)
+
+    for index, left, top, cell_width, cell_height in _cells(len(entries), columns, (margin, margin), area):
+        number, name, cutout_file = entries[index]
+        player_height = cell_height - label_height - spacing
+        paste_fitted(canvas, cutout_file, (left + spacing // 2, top, cell_width - spacing, player_height))
+        if labels:
+            text = caption(number, name)
+            font = caption_font(font_path, text, cell_width - spacing, font_size)
+            draw.text((left + cell_width // 2, top + player_height + spacing // 4), text,
+                      font=font, fill='white', anchor='mt', stroke_width=2, stroke_fill='black')
+    return canvas
+
+
+def write_contact_sheet(entries, output_file, page_size=SHEET_SIZE, columns=5, rows=6, margin=120,
+                        spacing=30, font_path=None, title='Kontaktbogen'):
+    """
+    Kontaktbogen mit columns x rows Spielern pro Seite, Seite für Seite geschrieben
+    .pdf: alle Seiten in einer Datei, sonst eine Bilddatei pro Seite (name-1.jpg, ...)
+    Gibt die Liste der geschriebenen Dateien zurück
+    """
+    output_file = Path(output_file)
+    entries = sorted(entries, key=number_key)
+    per_page = columns * rows
+    pages = max(1, math.ceil(len(entries) / per_page))
+    is_pdf = output_file.suffix.lower() == '.pdf'
+
+    resolved_font = resolve_font_path(font_path)
+    header_height = page_size[1] // 30
+    label_height = page_size[1] // 70
+    header_font = get_font(resolved_font, int(header_height * 0.6))
+    area = (page_size[0] - 2 * margin, page_size[1] - 2 * margin - header_height)
+
+    written = []
+    for page_index in range(pages):
+        page = Image.new('RGB', page_size, 'white')
+        draw = ImageDraw.Draw(page)
+        draw.text((margin, margin), f"{title} – Seite {page_index + 1}/{pages}",
+                  font=header_font, fill='black')
+
+        page_entries = entries[page_index * per_page:(page_index + 1) * per_page]
+        cells = _cells(len(page_entries), columns, (margin, margin + header_height), (area[0], area[1]))
+        # Volle Zeilenhöhe auch auf der letzten Seite, damit alle Seiten gleich aussehen
+        cell_height = area[1] // rows
+        for index, left, top, cell_width, _ in cells:
+            number, name, cutout_file = page_entries[index]
+            top = margin + header_height + (index // columns) * cell_height
+            frame = (left + spacing // 2, top + spacing // 2,
+                     left + cell_width - spacing // 2, top + cell_height - spacing // 2)
+            draw.rectangle(frame, outline=(200, 200, 200), width=2)
+            player_height = frame[3] - frame[1] - label_height - spacing
+            paste_fitted(page, cutout_file, (frame[0] + spacing // 2, frame[1] + spacing // 2,
+                                             frame[2] - frame[0] - spacing, player_height))
+            text = caption(number, name)
+            font = caption_font(resolved_font, text, frame[2] - frame[0] - spacing, int(label_height * 0.8))
+            draw.text(((frame[0] + frame[2]) // 2, frame[3] - spacing // 2), text,
+                      font=font, fill='black', anchor='md')
+
+        if is_pdf:
+            page.save(output_file, 'PDF', resolution=SHEET_DPI, append=page_index > 0)
+            if page_index == 0:
+                written.append(output_file)
+        else:
+            page_file = output_file if pages == 1 else \
+                output_file.with_name(f"{output_file.stem}-{page_index + 1}{output_file.suffix}")
+            page.save(page_file, dpi=(SHEET_DPI, SHEET_DPI), quality=92)
+            written.append(page_file)
+        # Seite freigeben, bevor die nächste entsteht
+        del page, draw
+    return written
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Text-Renderer für Spielername und Nummer
+Schriften werden einmal pro Lauf aufgelöst und gecacht, Konturen in einem
+Durchgang mit stroke_width gezeichnet und fertige Textebenen wiederverwendet
+"""
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Standardschriften in der Reihenfolge, in der sie versucht werden
+FONT_CANDIDATES = [
+    ('/System/Library/Fonts/Arial.ttf', 'Arial (macOS)'),
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 'DejaVu (Linux)'),
+]
+
+NUMBER_STROKE = 2
+NAME_STROKE = 1
+
+# Abstände der Namensebene wie beim bisherigen 500x100-Hilfsbild
+NAME_PAD_X = 10
+NAME_PAD_Y = 20
+NAME_BOX = 500
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def resolve_font_path(font_path=None):
+    """
+    Sucht einmal pro Lauf die zu verwendende Schriftdatei
+    Gibt None zurück, wenn nur die Pillow-Standardschrift übrig bleibt
+    """
+    if font_path and Path(font_path).exists():
+        logger.info("    📝 Verwende eigene Schrift: %s", font_path)
+        return font_path
+    for candidate, label in FONT_CANDIDATES:
+        try:
+            ImageFont.truetype(candidate, 10)
+        except OSError:
+            continue
+        logger.info("    📝 Verwende %s", label)
+        return candidate
+    logger.info("    📝 Verwende Default-Schrift")
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_font(font_path, size):
+    """
+    ImageFont pro (Pfad, Größe) nur einmal laden
+    """
+    if font_path is None:
+        return ImageFont.load_default()
+    try:
+        return ImageFont.truetype(font_path, size)
+    except OSError as e:
+        logger.warning("    ⚠️ Schriftfehler, verwende Default: %s", e)
+        return ImageFont.load_default()
+
+
+def _text_bbox(text, font, stroke_width):
+    scratch = ImageDraw.Draw(Image.new('L', (1, 1)))
+    return scratch.textbbox((0, 0), text, font=font, stroke_width=stroke_width)
+
+
+@lru_cache(maxsize=512)
+def render_number_layer(number, font_path, size):
+    """
+    Weiße Nummer mit schwarzer Kontur als RGBA-Ebene
+    Rückgabe: (Ebene, Versatz zum Textursprung) – Nummern wiederholen sich, daher gecacht
+    """
+    font = get_font(font_path, size)
+    left, top, right, bottom = _text_bbox(number, font, NUMBER_STROKE)
+    layer = Image.new('RGBA', (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((-left, -top), number, font=font, fill='white',
+                               stroke_width=NUMBER_STROKE, stroke_fill='black')
+    return layer, (left, top)
+
+
+@lru_cache(maxsize=512)
+def render_name_layer(name, font_path, size):
+    """
+    Um 90 Grad gedrehter Name mit schwarzer Kontur
+    Die Ebene wird aus der echten Textgröße berechnet, lange Namen werden nicht abgeschnitten
+    """
+    font = get_font(font_path, size)
+    left, top, right, bottom = _text_bbox(name, font, NAME_STROKE)
+    width = max(1, right - left) + 2 * NAME_PAD_X
+    height = NAME_PAD_Y + max(0, bottom) + NAME_PAD_X
+    layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((NAME_PAD_X - left, NAME_PAD_Y), name, font=font, fill='white',
+                               stroke_width=NAME_STROKE, stroke_fill='black')
+    return layer.rotate(90, expand=True)
+
+
+def name_paste_y(name_start_y, layer_height, img_height, margin=25):
+    """
+    Wie bisher endet der Name unten im 500px-Feld unter der Nummer
+    Passt er dort nicht hinein, beginnt er direkt unter der Nummer
+    """
+    paste_y = min(name_start_y + NAME_BOX, img_height - margin) - layer_height
+    if paste_y < name_start_y:
+        paste_y = min(name_start_y, img_height - layer_height - margin)
+    return paste_y
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Upload der fertigen Bilder in den S3-Bucket der Galerie (--upload)
+Die Bucket-Liste wird einmal gelesen und mit lokalen Prüfsummen verglichen (ETag,
+bei fremder Teilgröße die sha256-Metadaten), hochgeladen werden nur geänderte Dateien.
+Mehrere Dateien laufen parallel über einen gemeinsamen Client mit Verbindungs-Pool,
+große Dateien als Multipart. boto3 wird nur für den Upload benötigt
+"""
+
+import hashlib
+import logging
+import mimetypes
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Bucket aus hugo/esc/config.toml ([params.s3])
+DEFAULT_BUCKET = 'esc'
+# Eigener Präfix: im Bucket liegen auch die Galerie-Bilder (s3gallery/s3image)
+DEFAULT_PREFIX = 'spieler/'
+# Öffentliche Adresse https://<bucket>.<domain> wie params.s3 in hugo/esc/config.toml
+S3_DOMAIN = 's3.kuepper.nrw'
+DEFAULT_WORKERS = 8
+
+# Ab dieser Größe als Multipart in Teilen dieser Größe (bestimmt auch den ETag)
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+
+# Bilder ändern sich selten, Datenfiles für Hugo sollen sofort aktuell sein
+DEFAULT_CACHE_CONTROL = 'public, max-age=86400'
+CACHE_CONTROL = {'.json': 'no-cache'}
+
+CONTENT_TYPES = {'.webp': 'image/webp', '.avif': 'image/avif', '.json': 'application/json'}
+
+
+def make_client(endpoint_url=None, region=None, workers=DEFAULT_WORKERS):
+    """
+    S3-Client mit einem Verbindungs-Pool für workers parallele Uploads
+    endpoint_url: S3-kompatibler Dienst (MinIO, moto), sonst AWS bzw. AWS_ENDPOINT_URL
+    """
+    try:
+        import boto3
+        from botocore.config import Config
+    except ImportError as e:
+        raise RuntimeError("Für --upload wird boto3 benötigt: pip install boto3") from e
+
+    config = Config(max_pool_connections=workers * 2, retries={'max_attempts': 5, 'mode': 'standard'})
+    return boto3.client('s3', endpoint_url=endpoint_url, region_name=region, config=config)
+
+
+def public_url(bucket, key=''):
+    """
+    Öffentliche URL eines Schlüssels (oder Präfixes) im Bucket
+    """
+    return f"https://{bucket}.{S3_DOMAIN}/{key.strip('/')}".rstrip('/')
+
+
+def transfer_config(workers=DEFAULT_WORKERS):
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(multipart_threshold=MULTIPART_THRESHOLD, multipart_chunksize=MULTIPART_CHUNKSIZE,
+                          max_concurrency=max(1, workers // 2))
+
+
+def local_digests(path, size):
+    """
+    (sha256, erwarteter ETag) in einem Durchgang
+    Der ETag ist MD5 des Inhalts, bei Multipart MD5 der Teil-MD5s mit '-Anzahl'
+    """
+    sha256 = hashlib.sha256()
+    part_md5s = []
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(MULTIPART_CHUNKSIZE), b''):
+            sha256.update(chunk)
+            part_md5s.append(hashlib.md5(chunk))
+    if size < MULTIPART_THRESHOLD:
+        etag = part_md5s[0].hexdigest() if part_md5s else hashlib.md5(b'').hexdigest()
+    else:
+        combined = hashlib.md5(b''.join(md5.digest() for md5 in part_md5s))
+        etag = f"{combined.hexdigest()}-{len(part_md5s)}"
+    return sha256.hexdigest(), etag
+
+
+def collect_files(sources, exclude=()):
+    """
+    {Schlüssel: Datei} aus [(Ordner, Präfix), ...], rekursiv, ohne versteckte und .tmp-Dateien
+    exclude: Dateien, die nicht in den Bucket gehören (z.B. der Kader-Index mit lokalen Pfaden)
+    """
+    excluded = {Path(path).resolve() for path in exclude}
+    files = {}
+    for folder, prefix in sources:
+        folder = Path(folder)
+        if not folder.is_dir():
+            continue
+        for path in sorted(folder.rglob('*')):
+            relative = path.relative_to(folder)
+            if not path.is_file() or path.suffix == '.tmp' or \
+                    any(part.startswith('.') for part in relative.parts) or path.resolve() in excluded:
+                continue
+            files[prefix + relative.as_posix()] = path
+    return files
+
+
+def remote_objects(client, bucket, prefix=''):
+    """
+    {Schlüssel: (ETag, Größe)} aller Objekte unter prefix (eine paginierte Liste statt HEAD pro Datei)
+    """
+    objects = {}
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get('Contents', []):
+            objects[item['Key']] = (item['ETag'].strip('"'), item['Size'])
+    return objects
+
+
+def upload_args(path, sha256):
+    content_type = CONTENT_TYPES.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0] \
+        or 'application/octet-stream'
+    return {'ContentType': content_type,
+            'CacheControl': CACHE_CONTROL.get(path.suffix.lower(), DEFAULT_CACHE_CONTROL),
+            'Metadata': {'sha256': sha256}}
+
+
+def is_unchanged(client, bucket, key, remote, sha256, etag):
+    """
+    Vergleicht über den ETag, fremde Multipart-ETags über die sha256-Metadaten
+    """
+    remote_etag, _ = remote
+    if remote_etag == etag:
+        return True
+    if '-' in remote_etag:
+        # Mit anderer Teilgröße hochgeladen, der ETag ist nicht vergleichbar
+        head = client.head_object(Bucket=bucket, Key=key)
+        return head.get('Metadata', {}).get('sha256') == sha256
+    return False
+
+
+def check_file(client, bucket, key, path, remote):
+    """
+    Prüft, ob path sich vom Objekt im Bucket unterscheidet
+    Gibt (geändert, Bytes, sha256) zurück
+    """
+    size = path.stat().st_size
+    sha256, etag = local_digests(path, size)
+    unchanged = remote is not None and remote[1] == size and \
+        is_unchanged(client, bucket, key, remote, sha256, etag)
+    return not unchanged, size, sha256
+
+
+def sync_file(client, bucket, key, path, remote, config):
+    """
+    Lädt path hoch, wenn sich der Inhalt vom Objekt im Bucket unterscheidet
+    Gibt ('uploaded' oder 'skipped', Bytes, Dauer in ms) zurück
+    """
+    start = time.perf_counter()
+    changed, size, sha256 = check_file(client, bucket, key, path, remote)
+    if not changed:
+        return 'skipped', 0, (time.perf_counter() - start) * 1000
+    client.upload_file(str(path), bucket, key, ExtraArgs=upload_args(path, sha256), Config=config)
+    return 'uploaded', size, (time.perf_counter() - start) * 1000
+
+
+def upload_folders(sources, bucket=DEFAULT_BUCKET, prefix=DEFAULT_PREFIX, endpoint_url=None, region=None,
+                   workers=DEFAULT_WORKERS, delete=False, dry_run=False, metrics=None, client=None, exclude=()):
+    """
+    Gleicht die Dateien aus sources [(Ordner, Präfix im Bucket), ...] mit dem Bucket ab
+    Liste und Löschen bleiben auf prefix beschränkt
+    delete: Objekte unter prefix löschen, die es lokal nicht mehr gibt (nur mit nicht leerem prefix)
+    dry_run: nur anzeigen, was hochgeladen bzw. gelöscht würde (gleiche Prüfung wie beim Abgleich)
+    exclude: Dateien aus sources, die nicht hochgeladen werden
+    Gibt {'uploaded', 'skipped', 'deleted', 'errors', 'bytes'} zurück
+    """
+    if delete and not prefix.strip('/'):
+        # Ohne Präfix wären das alle Objekte im Bucket, auch die der Galerie
+        raise ValueError("Löschen nur mit eigenem Präfix, nicht im ganzen Bucket")
+    client = client or make_client(endpoint_url, region, workers)
+    files = collect_files([(folder, prefix + folder_prefix) for folder, folder_prefix in sources], exclude)
+    remote = remote_objects(client, bucket, prefix)
+    summary = {'uploaded': 0, 'skipped': 0, 'deleted': 0, 'errors': 0, 'bytes': 0}
+    logger.info("☁️ %s lokale Dateien, %s Objekte in s3://%s/%s", len(files), len(remote), bucket, prefix)
+
+    if dry_run:
+        for key, path in files.items():
+            if check_file(client, bucket, key, path, remote.get(key))[0]:
+                logger.info("  ⬆ würde hochladen: %s", key)
+        if delete:
+            for key in sorted(set(remote) - set(files)):
+                logger.info("  🗑 würde entfernen: %s", key)
+        return summary
+
+    config = transfer_config(workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(sync_file, client, bucket, key, path, remote.get(key), config): key
+                   for key, path in files.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                status, size, ms = future.result()
+            except Exception as e:
+                logger.error("  ✗ Fehler bei %s: %s", key, e)
+                summary['errors'] += 1
+                if metrics is not None:
+                    metrics.record('upload', files[key], 'error', error=e, key=key)
+                continue
+            summary[status] += 1
+            summary['bytes'] += size
+            if status == 'uploaded':
+                logger.info("  ⬆ Hochgeladen: %s", key)
+            else:
+                logger.debug("  ⏭ Unverändert: %s", key)
+            if metrics is not None:
+                metrics.record('upload', files[key], 'ok' if status == 'uploaded' else status,
+                               {'upload': ms}, key=key)
+
+    if delete:
+        stale = sorted(set(remote) - set(files))
+        # delete_objects nimmt höchstens 1000 Schlüssel pro Aufruf
+        for start in range(0, len(stale), 1000):
+            batch = stale[start:start + 1000]
+            client.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': key} for key in batch],
+                                                         'Quiet': True})
+            for key in batch:
+                logger.info("  🗑 Entfernt: %s", key)
+        summary['deleted'] = len(stale)
+    return summary
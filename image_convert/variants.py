@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Responsive Bildvarianten für die Hugo-Seite
+Schreibt aus dem bereits dekodierten finalen Bild mehrere Breiten als WebP und JPEG (optional AVIF)
+und ein JSON-Datenfile mit URLs und Abmessungen für srcset/width/height
+Mit einem Ziel (Byte-Budget oder SSIM) wird die Qualität pro Variante gesucht und im
+Datenfile vermerkt, spätere Läufe übernehmen sie für dasselbe Bild ohne neue Suche
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from encoder import describe, encode_to_target
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+
+# Dateiendung → (Pillow-Format, Speicheroptionen)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'avif': ('AVIF', {'quality': 60, 'speed': 6}),
+}
+DEFAULT_FORMATS = ('webp', 'jpg')
+
+
+def parse_widths(value):
+    """
+    '320,640,1280' → (320, 640, 1280)
+    """
+    return tuple(sorted({int(width) for width in value.split(',') if width.strip()}))
+
+
+def parse_formats(value):
+    """
+    'avif,webp,jpg' → ('avif', 'webp', 'jpg'), nur Formate, die Pillow hier schreiben kann
+    """
+    from PIL import features
+
+    formats = tuple(dict.fromkeys(ext.strip().lower() for ext in value.split(',') if ext.strip()))
+    for ext in formats:
+        if ext not in FORMATS:
+            raise argparse.ArgumentTypeError(f"Unbekanntes Format '{ext}' (erlaubt: {', '.join(FORMATS)})")
+        if ext in ('webp', 'avif') and not features.check(ext):
+            raise argparse.ArgumentTypeError(f"Pillow wurde ohne {ext.upper()}-Unterstützung gebaut")
+    return formats
+
+
+def variant_widths(image_width, widths):
+    """
+    Breiten größer als das Original werden auf die Originalbreite begrenzt
+    """
+    return sorted({min(width, image_width) for width in widths})
+
+
+def variant_path(output_folder, stem, width, ext):
+    return Path(output_folder) / f"{stem}-{width}w.{ext}"
+
+
+def write_variants(image, stem, output_folder, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, target=None,
+                   qualities=None):
+    """
+    Schreibt alle Varianten eines Bildes, von groß nach klein verkleinert
+    Gibt eine Liste von {'file', 'width', 'height', 'format', 'quality', 'bytes'} zurück
+    target: EncodeTarget, Qualität pro Variante suchen (sonst feste Qualität aus FORMATS)
+    qualities: {(Breite, Format): Qualität} aus einem früheren Lauf, ohne Suche übernehmen
+    """
+    qualities = qualities or {}
+    variants = []
+    source = image
+    for width in reversed(variant_widths(image.width, widths)):
+        height = round(image.height * width / image.width)
+        if source.size != (width, height):
+            # Aus der nächstgrößeren Variante verkleinern spart Rechenzeit
+            source = source.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for ext in formats:
+            pil_format, options = FORMATS[ext]
+            output_file = variant_path(output_folder, stem, width, ext)
+            data, info = encode_to_target(source, pil_format, options, target, qualities.get((width, ext)))
+            output_file.write_bytes(data)
+            variants.append(dict(info, file=output_file.name, width=width, height=height, format=ext))
+    return sorted(variants, key=lambda v: (v['format'], v['width']))
+
+
+def image_hash(image):
+    """
+    Hash der Pixel, damit gesuchte Qualitäten nur für dasselbe Bild übernommen werden
+    """
+    return hashlib.sha256(image.tobytes()).hexdigest()[:16]
+
+
+def write_encoded_variants(image, stem, output_folder, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS,
+                           target=None, previous=None):
+    """
+    write_variants mit Ziel-Kodierung, gibt (Varianten, Kodierung) zurück
+    previous: bisheriger Eintrag im Datenfile, bei gleichem Bild und Ziel entfällt die Suche
+    """
+    if describe(target) is None:
+        return write_variants(image, stem, output_folder, widths, formats), None
+
+    encoding = {'target': describe(target), 'source': image_hash(image)}
+    qualities = None
+    if previous and previous.get('encoding') == encoding:
+        qualities = {(v['width'], v['format']): v['quality'] for v in previous.get('variants', [])
+                     if 'quality' in v}
+    return write_variants(image, stem, output_folder, widths, formats, target, qualities), encoding
+
+
+class VariantWriter:
+    """
+    Schreibt Varianten parallel im Hintergrund und pflegt das Datenfile für Hugo
+    """
+
+    def __init__(self, output_folder, data_file, url_prefix='/images/players',
+                 widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, workers=None, target=None):
+        self.output_folder = Path(output_folder)
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        self.data_file = Path(data_file)
+        self.url_prefix = url_prefix.rstrip('/')
+        self.widths = widths
+        self.formats = formats
+        # EncodeTarget: Qualität pro Variante suchen (Suchen laufen parallel im Thread-Pool)
+        self.target = target
+        workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # Höchstens zwei wartende Bilder pro Thread im Speicher halten
+        self.slots = threading.BoundedSemaphore(2 * workers)
+        self.futures = {}
+        self.manifest = {}
+        if self.data_file.exists():
+            try:
+                with open(self.data_file, 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                self.manifest = {}
+
+    def paths(self, stem, image_width=None):
+        """
+        Alle Dateien, die für ein Bild entstehen (für Cache und Aufräumen)
+        """
+        widths = variant_widths(image_width, self.widths) if image_width else self.widths
+        return [variant_path(self.output_folder, stem, width, ext)
+                for width in widths for ext in self.formats]
+
+    def submit(self, image, stem):
+        """
+        Varianten im Hintergrund schreiben, image darf danach nicht mehr verändert werden
+        """
+        self.slots.acquire()
+        future = self.executor.submit(write_encoded_variants, image, stem, self.output_folder,
+                                      self.widths, self.formats, self.target, self.manifest.get(stem))
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures[stem] = future
+
+    def finish(self, existing_stems=None):
+        """
+        Wartet auf alle Varianten und schreibt das Datenfile
+        existing_stems: Einträge für nicht mehr vorhandene Bilder werden entfernt
+        """
+        errors = {}
+        for stem, future in self.futures.items():
+            try:
+                variants, encoding = future.result()
+                variants = [dict(v, url=f"{self.url_prefix}/{v['file']}") for v in variants]
+            except Exception as e:
+                errors[stem] = e
+                continue
+            # Größte JPEG-Variante als src-Fallback, Abmessungen für width/height
+            fallback = max((v for v in variants if v['format'] == 'jpg'),
+                           key=lambda v: v['width'], default=variants[-1])
+            self.manifest[stem] = {
+                'src': fallback['url'],
+                'width': fallback['width'],
+                'height': fallback['height'],
+                'variants': variants,
+            }
+            if encoding is not None:
+                self.manifest[stem]['encoding'] = encoding
+        # Executor bleibt offen, mit --watch folgen weitere Bilder
+        self.futures = {}
+
+        if existing_stems is not None:
+            for stem in set(self.manifest) - set(existing_stems):
+                del self.manifest[stem]
+
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.data_file.with_name(self.data_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp_file, self.data_file)
+        return errors
+
+
+def write_variants_for_folder(final_folder, writer):
+    """
+    Varianten für alle vorhandenen *_final.jpg erzeugen (z.B. nach einem Streaming-Lauf)
+    """
+    stems = []
+    for final_file in sorted(Path(final_folder).glob('*_final.jpg')):
+        stem = final_file.stem.replace('_final', '')
+        with Image.open(final_file) as img:
+            writer.submit(img.convert('RGB'), stem)
+        stems.append(stem)
+    return stems
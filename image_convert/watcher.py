@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Überwacht Ordner auf neue, geänderte und gelöschte Bilder (--watch)
+Mit watchdog (inotify/FSEvents/...) wird sofort geprüft, ohne watchdog in festen Abständen.
+Eine Datei gilt erst als fertig, wenn Größe und Änderungszeit für settle Sekunden
+gleich bleiben, halb hochgeladene Fotos werden so nicht verarbeitet
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTLE = 0.75
+DEFAULT_INTERVAL = 0.5
+
+# Ohne Ereignis trotzdem gelegentlich nachsehen (z.B. Netzlaufwerke ohne inotify)
+RESCAN_INTERVAL = 30.0
+
+
+class FolderWatcher:
+    """
+    Liefert über changes() Stapel von (fertigen, gelöschten) Dateien
+    known: bereits verarbeiteter Stand, Dateien darin lösen nichts aus
+    """
+
+    def __init__(self, folders, suffixes, settle=DEFAULT_SETTLE, interval=DEFAULT_INTERVAL):
+        self.folders = [Path(folder) for folder in dict.fromkeys(folders)]
+        self.suffixes = suffixes
+        self.settle = settle
+        self.interval = interval
+        self.wakeup = threading.Event()
+        self.known = self.snapshot()
+        self.pending = {}
+        self.observer = self._start_observer()
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.info("👀 watchdog nicht installiert, prüfe alle %.1f s", self.interval)
+            return None
+
+        wakeup = self.wakeup
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wakeup.set()
+
+        observer = Observer()
+        for folder in self.folders:
+            observer.schedule(Handler(), str(folder), recursive=False)
+        observer.start()
+        logger.info("👀 Überwache mit watchdog: %s", ', '.join(str(folder) for folder in self.folders))
+        return observer
+
+    def snapshot(self):
+        """
+        {Pfad: (Größe, Änderungszeit)} aller passenden Dateien, versteckte/temporäre Dateien ausgenommen
+        """
+        files = {}
+        for folder in self.folders:
+            if not folder.is_dir():
+                continue
+            for path in folder.iterdir():
+                if path.name.startswith('.') or path.suffix.lower() not in self.suffixes:
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def poll(self):
+        """
+        Einmal prüfen, gibt (fertige, gelöschte) Dateien zurück
+        """
+        now = time.monotonic()
+        current = self.snapshot()
+        removed = sorted(path for path in self.known if path not in current)
+        for path in removed:
+            del self.known[path]
+        for path in list(self.pending):
+            if path not in current:
+                del self.pending[path]
+
+        ready = []
+        for path, signature in current.items():
+            if self.known.get(path) == signature:
+                continue
+            seen = self.pending.get(path)
+            if seen is None or seen[0] != signature:
+                # Neu oder noch in Bewegung: Ruhezeit ab jetzt
+                self.pending[path] = (signature, now)
+            elif now - seen[1] >= self.settle:
+                ready.append(path)
+                self.known[path] = signature
+                del self.pending[path]
+        return sorted(ready), removed
+
+    def wait(self):
+        """
+        Wartet auf das nächste Ereignis, solange Dateien zur Ruhe kommen höchstens ein Intervall
+        """
+        if self.observer is None or self.pending:
+            timeout = self.interval if not self.pending else min(self.interval, self.settle / 2)
+        else:
+            timeout = RESCAN_INTERVAL
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+
+    def changes(self):
+        """
+        Endlose Folge von (fertige, gelöschte) Stapeln, nur wenn sich etwas getan hat
+        """
+        while True:
+            self.wait()
+            ready, removed = self.poll()
+            if ready or removed:
+                yield ready, removed
+
+    def close(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()